@@ -0,0 +1,278 @@
+import datetime
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import frappe
+from frappe import _
+from frappe.utils import add_days, get_datetime, getdate, now_datetime, today
+
+from fbts.api.shift_resolver import get_shift_resolver
+from fbts.api.team_access import TEAM_CONDITION, is_hr, resolve_approver
+
+ANOMALY_DOCTYPE = "Attendance Anomaly"
+SCANNED_UNTIL_KEY = "fbts_anomaly_scanned_until"
+CLOSED_DAY_KEY = "fbts_anomaly_closed_day"
+# Rows committed late (write-behind flushes, long transactions) can carry an
+# older `creation`; each run re-reads this much before the watermark.
+SCAN_OVERLAP = datetime.timedelta(minutes=10)
+
+MISSING_OUT = "Missing OUT"
+DOUBLE_IN = "Double IN"
+DOUBLE_OUT = "Double OUT"
+SHORT_SESSION = "Short Session"
+LONG_SESSION = "Long Session"
+OUT_OF_SHIFT = "Out of Shift"
+
+SHORT_SESSION_MINUTES = 5
+LONG_SESSION_HOURS = 14
+SHIFT_MARGIN = datetime.timedelta(hours=2)
+REVIEW_STATUSES = ("Resolved", "Dismissed")
+
+INSERT_FIELDS = [
+    "name",
+    "employee",
+    "employee_name",
+    "attendance_date",
+    "anomaly_type",
+    "checkin",
+    "checkin_time",
+    "details",
+    "status",
+    "creation",
+    "modified",
+    "owner",
+    "modified_by",
+]
+
+# Each branch runs on its own index: creation_index, Frappe's `modified`
+# index, and the anomaly's unique (checkin, anomaly_type) key.
+CHANGED_PAIRS_QUERY = f"""
+    SELECT employee, DATE(time)
+    FROM `tabEmployee Checkin`
+    WHERE creation > %(start)s AND creation <= %(end)s
+    UNION
+    SELECT employee, DATE(time)
+    FROM `tabEmployee Checkin`
+    WHERE modified > %(start)s AND modified <= %(end)s
+    UNION
+    SELECT an.employee, an.attendance_date
+    FROM `tab{ANOMALY_DOCTYPE}` an
+    INNER JOIN `tabEmployee Checkin` c ON c.name = an.checkin
+    WHERE an.status = 'Open' AND c.modified > %(start)s AND c.modified <= %(end)s
+"""
+
+DAY_CHECKINS_QUERY = """
+    SELECT name, employee, employee_name, log_type, time
+    FROM `tabEmployee Checkin`
+    WHERE employee = %(employee)s AND time >= %(start)s AND time < %(end)s
+    ORDER BY time, creation
+"""
+
+
+# -----------------------------
+# Detection
+# -----------------------------
+def _shift_window(shifts, employee: str, d: datetime.date) -> Optional[Tuple[datetime.datetime, datetime.datetime]]:
+    entry = shifts.shift_on(employee, d)
+    if not entry or entry[3] is None or entry[4] is None:
+        return None
+    start = get_datetime(d) + entry[3]
+    end = get_datetime(d) + entry[4]
+    if end <= start:  # overnight shift
+        end += datetime.timedelta(days=1)
+    return start - SHIFT_MARGIN, end + SHIFT_MARGIN
+
+
+def detect_day_anomalies(
+    punches: List[Dict[str, Any]], window: Optional[Tuple[datetime.datetime, datetime.datetime]], day_closed: bool
+) -> List[Tuple[str, Dict[str, Any], str]]:
+    """(anomaly_type, punch, details) for one employee's punches of one day, in time order."""
+    found = []
+    open_in = None
+    last_type = None
+    for p in punches:
+        time = get_datetime(p["time"])
+        if window and not window[0] <= time <= window[1]:
+            found.append((OUT_OF_SHIFT, p, f"{time:%H:%M} outside shift window"))
+
+        if p["log_type"] == "IN":
+            if last_type == "IN":
+                found.append((DOUBLE_IN, p, f"IN at {time:%H:%M} follows IN at {get_datetime(open_in['time']):%H:%M}"))
+            open_in = p
+        elif p["log_type"] == "OUT":
+            if open_in:
+                minutes = (time - get_datetime(open_in["time"])).total_seconds() / 60
+                if minutes < SHORT_SESSION_MINUTES:
+                    found.append((SHORT_SESSION, p, f"{minutes:.0f} min session"))
+                elif minutes > LONG_SESSION_HOURS * 60:
+                    found.append((LONG_SESSION, p, f"{minutes / 60:.1f} h session"))
+            elif last_type == "OUT":
+                found.append((DOUBLE_OUT, p, f"OUT at {time:%H:%M} without a preceding IN"))
+            open_in = None
+        last_type = p["log_type"]
+
+    if day_closed and open_in:
+        found.append((MISSING_OUT, open_in, f"No OUT after IN at {get_datetime(open_in['time']):%H:%M}"))
+    return found
+
+
+# -----------------------------
+# Helpers
+# -----------------------------
+def _pairs_changed_between(start, end) -> Set[Tuple[str, datetime.date]]:
+    """
+    (employee, day) pairs with punches created or modified in (start, end],
+    plus the day an edited punch's open anomalies were raised on, so a punch
+    moved by regularisation (or to another employee) clears its old day too.
+    """
+    rows = frappe.db.sql(CHANGED_PAIRS_QUERY, {"start": start, "end": end})
+    return {(employee, getdate(d)) for employee, d in rows}
+
+
+def _pairs_on_days(start: datetime.date, end: datetime.date) -> Set[Tuple[str, datetime.date]]:
+    """Every (employee, day) with punches in [start, end], from the daily summary."""
+    rows = frappe.db.get_all(
+        "Daily Attendance Summary",
+        filters={"attendance_date": ["between", [start, end]]},
+        fields=["employee", "attendance_date"],
+        as_list=True,
+        limit=None,
+    )
+    return {(employee, getdate(d)) for employee, d in rows}
+
+
+def _scan_pairs(pairs: Set[Tuple[str, datetime.date]], current: datetime.date) -> int:
+    """Re-evaluate each (employee, day): replace its open anomalies with the current findings."""
+    if not pairs:
+        return 0
+    days = [d for _e, d in pairs]
+    shifts = get_shift_resolver(min(days), max(days))
+    now, values = frappe.utils.now(), []
+
+    by_employee: Dict[str, List[datetime.date]] = defaultdict(list)
+    for employee, d in pairs:
+        by_employee[employee].append(d)
+
+    for employee, dates in by_employee.items():
+        frappe.db.delete(ANOMALY_DOCTYPE, {"employee": employee, "attendance_date": ["in", dates], "status": "Open"})
+        for d in dates:
+            punches = frappe.db.sql(
+                DAY_CHECKINS_QUERY, {"employee": employee, "start": d, "end": add_days(d, 1)}, as_dict=True
+            )
+            for anomaly_type, punch, details in detect_day_anomalies(
+                punches, _shift_window(shifts, employee, d), day_closed=d < current
+            ):
+                values.append((
+                    frappe.generate_hash(length=10),
+                    employee,
+                    punch["employee_name"],
+                    d,
+                    anomaly_type,
+                    punch["name"],
+                    punch["time"],
+                    details,
+                    "Open",
+                    now,
+                    now,
+                    "Administrator",
+                    "Administrator",
+                ))
+
+    # (checkin, anomaly_type) is unique: anomalies already reviewed are not raised again.
+    frappe.db.bulk_insert(ANOMALY_DOCTYPE, INSERT_FIELDS, values, ignore_duplicates=True)
+    return len(values)
+
+
+def _can_review(employee: str) -> bool:
+    user = frappe.session.user
+    if is_hr(user):
+        return True
+    leave_approver, reports_to = frappe.db.get_value("Employee", employee, ["leave_approver", "reports_to"])
+    return leave_approver == user or bool(
+        reports_to and frappe.db.get_value("Employee", reports_to, "user_id") == user
+    )
+
+
+# -----------------------------
+# Scheduled jobs
+# -----------------------------
+def scan_attendance_anomalies():
+    """
+    Hourly job: evaluate only the (employee, day) pairs whose check-ins were
+    created or edited (e.g. regularised) since the last run, plus, once per day,
+    every pair of the day that just ended so trailing INs become Missing OUT anomalies.
+    """
+    current = getdate(today())
+    upto = now_datetime()
+    scanned_until = frappe.db.get_global(SCANNED_UNTIL_KEY)
+    since = get_datetime(scanned_until) - SCAN_OVERLAP if scanned_until else upto - datetime.timedelta(days=1)
+    pairs = _pairs_changed_between(since, upto)
+
+    closed_day = frappe.db.get_global(CLOSED_DAY_KEY)
+    yesterday = add_days(current, -1)
+    if not closed_day or getdate(closed_day) < yesterday:
+        first_open = add_days(getdate(closed_day), 1) if closed_day else yesterday
+        pairs |= _pairs_on_days(first_open, yesterday)
+
+    _scan_pairs(pairs, current)
+    frappe.db.set_global(SCANNED_UNTIL_KEY, str(upto))
+    frappe.db.set_global(CLOSED_DAY_KEY, str(yesterday))
+    frappe.db.commit()
+
+
+# -----------------------------
+# Main API
+# -----------------------------
+@frappe.whitelist()
+def get_attendance_anomalies(
+    approver: Optional[str] = None,
+    status: str = "Open",
+    from_date: Optional[str] = None,
+    to_date: Optional[str] = None,
+    limit: int = 50,
+):
+    """
+    Anomalies of employees whose leave approver (or reporting manager) is
+    `approver`, newest day first. `approver` defaults to the caller; only HR
+    may pass someone else.
+    """
+    approver = resolve_approver(approver)
+    conditions = ["an.status = %(status)s"]
+    if from_date:
+        conditions.append("an.attendance_date >= %(from_date)s")
+    if to_date:
+        conditions.append("an.attendance_date <= %(to_date)s")
+
+    return frappe.db.sql(
+        f"""
+        SELECT an.name, an.employee, an.employee_name, an.attendance_date, an.anomaly_type,
+               an.checkin, an.checkin_time, an.details, an.status
+        FROM `tab{ANOMALY_DOCTYPE}` an
+        INNER JOIN `tabEmployee` e ON e.name = an.employee
+        WHERE {" AND ".join(conditions)} AND {TEAM_CONDITION}
+        ORDER BY an.attendance_date DESC, an.checkin_time DESC
+        LIMIT %(limit)s
+        """,
+        {
+            "approver": approver,
+            "status": status,
+            "from_date": from_date,
+            "to_date": to_date,
+            "limit": min(int(limit or 50), 500),
+        },
+        as_dict=True,
+    )
+
+
+@frappe.whitelist()
+def review_attendance_anomaly(name: str, status: str):
+    """Mark an anomaly Resolved or Dismissed."""
+    if status not in REVIEW_STATUSES:
+        frappe.throw(_("status must be one of {0}").format(", ".join(REVIEW_STATUSES)), exc=frappe.ValidationError)
+    doc = frappe.get_doc(ANOMALY_DOCTYPE, name)
+    if not _can_review(doc.employee):
+        frappe.throw(_("Not permitted to review anomalies of {0}").format(doc.employee), exc=frappe.PermissionError)
+    doc.status = status
+    doc.save(ignore_permissions=True)
+    frappe.db.commit()
+    return {"name": doc.name, "status": doc.status}
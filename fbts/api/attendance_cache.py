@@ -0,0 +1,100 @@
+import datetime
+from typing import Any, Iterable, Optional
+
+import frappe
+from frappe.utils import add_months, get_first_day, getdate
+
+from fbts.api.generation_cache import bump_generation, get_generation, raw_key
+
+CACHE_PREFIX = "fbts:monthly"
+OPEN_MONTH_TTL = 60 * 60  # 1 hour
+CLOSED_MONTH_TTL = 7 * 24 * 60 * 60  # 7 days
+
+
+# -----------------------------
+# Helpers
+# -----------------------------
+def _month_key(employee: str, month_start: datetime.date) -> str:
+    return f"{CACHE_PREFIX}:{get_generation(CACHE_PREFIX)}:{employee}:{month_start.strftime('%Y-%m')}"
+
+
+def _months_between(start, end) -> Iterable[datetime.date]:
+    cur, last = get_first_day(getdate(start)), get_first_day(getdate(end))
+    while cur <= last:
+        yield cur
+        cur = add_months(cur, 1)
+
+
+# -----------------------------
+# Read / write
+# -----------------------------
+def get_cached_month(employee: str, month_start: datetime.date, grace_minutes: int) -> Optional[Any]:
+    """Cached month payload for (employee, month, grace) or None; counts hits and misses."""
+    value = frappe.cache().hget(_month_key(employee, month_start), str(int(grace_minutes or 0)))
+    frappe.cache().incr(raw_key(CACHE_PREFIX, "hits" if value is not None else "misses"))
+    return value
+
+
+def set_cached_month(employee: str, month_start: datetime.date, grace_minutes: int, value: Any) -> None:
+    name = _month_key(employee, month_start)
+    frappe.cache().hset(name, str(int(grace_minutes or 0)), value)
+
+    closed = add_months(month_start, 1) <= get_first_day(getdate())
+    frappe.cache().expire(frappe.cache().make_key(name), CLOSED_MONTH_TTL if closed else OPEN_MONTH_TTL)
+
+
+def invalidate_employee_months(employee: str, start, end=None) -> None:
+    """Drop cached months of `employee` touching [start, end]."""
+    if not employee or not start:
+        return
+    for month_start in _months_between(start, end or start):
+        frappe.cache().delete_value(_month_key(employee, month_start))
+
+
+def invalidate_all() -> None:
+    """Orphan every cached month at once; old keys age out through their TTL."""
+    bump_generation(CACHE_PREFIX)
+
+
+# -----------------------------
+# doc_events
+# -----------------------------
+def on_checkin_change(doc, method=None):
+    invalidate_employee_months(doc.employee, doc.time)
+    before = doc.get_doc_before_save() if method != "after_delete" else None
+    if before:
+        invalidate_employee_months(before.employee, before.time)
+
+
+def on_leave_change(doc, method=None):
+    invalidate_employee_months(doc.employee, doc.from_date, doc.to_date)
+    before = doc.get_doc_before_save() if method != "after_delete" else None
+    if before:
+        invalidate_employee_months(before.employee, before.from_date, before.to_date)
+
+
+def on_schedule_change(doc, method=None):
+    """Holiday List / Shift Assignment / Shift Type changes can affect any employee."""
+    invalidate_all()
+
+
+# -----------------------------
+# Stats
+# -----------------------------
+@frappe.whitelist()
+def get_monthly_cache_stats(reset: int = 0):
+    """Hit / miss counters of the monthly attendance cache."""
+    frappe.only_for("System Manager")
+
+    hits = int(frappe.cache().get(raw_key(CACHE_PREFIX, "hits")) or 0)
+    misses = int(frappe.cache().get(raw_key(CACHE_PREFIX, "misses")) or 0)
+    if int(reset or 0):
+        frappe.cache().delete(raw_key(CACHE_PREFIX, "hits"), raw_key(CACHE_PREFIX, "misses"))
+
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / total, 4) if total else None,
+        "generation": get_generation(CACHE_PREFIX),
+    }
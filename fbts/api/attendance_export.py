@@ -0,0 +1,166 @@
+import csv
+import os
+from typing import Optional
+
+import frappe
+from frappe import _
+
+from fbts.api.monthly import DEFAULT_PAGE_SIZE, _parse_month_to_range, iter_employee_holiday_names
+
+EXPORT_FORMATS = ("csv", "xlsx")
+EXPORT_COLUMNS = [
+    "employee",
+    "employee_name",
+    "date",
+    "holiday_name",
+    "check_in",
+    "check_out",
+    "total_hours",
+    "leave_type",
+    "leave_description",
+    "half_day",
+    "is_late",
+    "late_by_minutes",
+]
+PROGRESS_EVENT = "fbts_attendance_export_progress"
+
+
+# -----------------------------
+# Writers
+# -----------------------------
+class _CsvWriter:
+    def __init__(self, path: str):
+        self._fh = open(path, "w", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._fh)
+
+    def write(self, row):
+        self._writer.writerow(row)
+
+    def close(self):
+        self._fh.close()
+
+
+class _XlsxWriter:
+    """openpyxl write-only workbook: rows are streamed to disk, not kept in memory."""
+
+    def __init__(self, path: str):
+        from openpyxl import Workbook
+
+        self._path = path
+        self._wb = Workbook(write_only=True)
+        self._ws = self._wb.create_sheet("Attendance")
+
+    def write(self, row):
+        self._ws.append(row)
+
+    def close(self):
+        self._wb.save(self._path)
+
+
+def _iter_rows(month: Optional[str], grace_minutes: int):
+    """Yield (employee_index, row) with one row per employee-day."""
+    for n, (emp_id, payload) in enumerate(iter_employee_holiday_names(month, grace_minutes, DEFAULT_PAGE_SIZE)):
+        for day in payload.get("days", []):
+            yield n, [emp_id, payload.get("employee_name")] + [day.get(c) for c in EXPORT_COLUMNS[2:]]
+        if not payload.get("days"):
+            yield n, None
+
+
+# -----------------------------
+# Job
+# -----------------------------
+def _write_export(month: Optional[str], file_format: str, grace_minutes: int, user: str, file_name: str, path: str):
+    month_start, _end = _parse_month_to_range(month)
+    total = frappe.db.count("Employee", {"status": "Active"}) or 1
+    writer = _XlsxWriter(path) if file_format == "xlsx" else _CsvWriter(path)
+    try:
+        writer.write(EXPORT_COLUMNS)
+        last_reported = -1
+        for n, row in _iter_rows(month, grace_minutes):
+            if row:
+                writer.write(row)
+            percent = int((n + 1) * 100 / total)
+            if percent != last_reported:
+                frappe.publish_realtime(PROGRESS_EVENT, {"percent": percent, "file_name": file_name}, user=user)
+                last_reported = percent
+    finally:
+        writer.close()
+
+    file_doc = frappe.get_doc({
+        "doctype": "File",
+        "file_name": file_name,
+        "file_url": f"/private/files/{file_name}",
+        "is_private": 1,
+        "file_size": os.path.getsize(path),
+    })
+    file_doc.insert(ignore_permissions=True)
+
+    frappe.get_doc({
+        "doctype": "Notification Log",
+        "for_user": user,
+        "type": "Alert",
+        "subject": _("Attendance export for {0} is ready").format(month_start.strftime("%B %Y")),
+        "document_type": "File",
+        "document_name": file_doc.name,
+    }).insert(ignore_permissions=True)
+    frappe.db.commit()
+
+    frappe.publish_realtime(
+        PROGRESS_EVENT,
+        {"percent": 100, "file_name": file_name, "file_url": file_doc.file_url, "done": 1},
+        user=user,
+    )
+
+
+def _report_failure(month_start, file_name: str, path: str, user: str) -> None:
+    """Drop the partial file and tell `user` the export did not complete."""
+    frappe.db.rollback()
+    if os.path.exists(path):
+        os.remove(path)
+
+    frappe.log_error(title=f"Attendance export {file_name} failed")
+    frappe.get_doc({
+        "doctype": "Notification Log",
+        "for_user": user,
+        "type": "Alert",
+        "subject": _("Attendance export for {0} failed").format(month_start.strftime("%B %Y")),
+    }).insert(ignore_permissions=True)
+    frappe.db.commit()
+    frappe.publish_realtime(PROGRESS_EVENT, {"file_name": file_name, "failed": 1}, user=user)
+
+
+def export_monthly_attendance(month: Optional[str], file_format: str, grace_minutes: int, user: str):
+    """Background job: write the org-wide month to a private File and notify `user` (also on failure)."""
+    month_start, _end = _parse_month_to_range(month)
+    file_name = f"attendance-{month_start.strftime('%Y-%m')}-{frappe.generate_hash(length=8)}.{file_format}"
+    path = frappe.get_site_path("private", "files", file_name)
+
+    try:
+        _write_export(month, file_format, grace_minutes, user, file_name, path)
+    except Exception:
+        _report_failure(month_start, file_name, path, user)
+        raise
+
+
+# -----------------------------
+# Main API
+# -----------------------------
+@frappe.whitelist()
+def enqueue_attendance_export(month: Optional[str] = None, file_format: str = "csv", grace_minutes: int = 0):
+    """Queue an org-wide monthly attendance export; progress arrives on the `fbts_attendance_export_progress` event."""
+    frappe.only_for(("HR Manager", "System Manager"))
+
+    file_format = (file_format or "csv").lower()
+    if file_format not in EXPORT_FORMATS:
+        frappe.throw(_("file_format must be one of {0}").format(", ".join(EXPORT_FORMATS)), exc=frappe.ValidationError)
+
+    job = frappe.enqueue(
+        "fbts.api.attendance_export.export_monthly_attendance",
+        queue="long",
+        timeout=3600,
+        month=month,
+        file_format=file_format,
+        grace_minutes=int(grace_minutes or 0),
+        user=frappe.session.user,
+    )
+    return {"job_id": getattr(job, "id", None), "event": PROGRESS_EVENT}
@@ -0,0 +1,310 @@
+import datetime
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional
+
+import frappe
+from frappe.utils import add_days, get_datetime, getdate, today
+
+from fbts.api.bulk import reserve_names
+from fbts.api.leave_index import load_leave_index
+from fbts.api.shift_resolver import get_shift_resolver
+
+DIRTY_SET_KEY = "fbts:attendance_dirty"
+DIRTY_BATCH_SIZE = 500
+NO_DEPARTMENT = ""
+INSERT_FIELDS = [
+    "name",
+    "naming_series",
+    "employee",
+    "employee_name",
+    "company",
+    "department",
+    "attendance_date",
+    "status",
+    "leave_type",
+    "shift",
+    "in_time",
+    "out_time",
+    "working_hours",
+    "late_entry",
+    "docstatus",
+    "creation",
+    "modified",
+    "owner",
+    "modified_by",
+]
+
+# One row per active employee for the day: summary bounds, holiday flag and
+# any Attendance already recorded (draft or submitted), resolved in a single
+# statement. The holiday side is an EXISTS so duplicate Holiday rows on one
+# date cannot fan the employee out.
+DAY_QUERY = """
+    SELECT
+        e.name AS employee,
+        e.employee_name,
+        e.company,
+        e.department,
+        s.first_in,
+        s.last_out,
+        s.total_hours,
+        EXISTS (
+            SELECT 1 FROM `tabHoliday` h
+            WHERE h.parent = COALESCE(NULLIF(e.holiday_list, ''), c.default_holiday_list)
+              AND h.holiday_date = %(date)s
+        ) AS holiday,
+        a.name AS attendance,
+        a.docstatus AS attendance_docstatus,
+        a.leave_application,
+        a.attendance_request
+    FROM `tabEmployee` e
+    LEFT JOIN `tabCompany` c ON c.name = e.company
+    LEFT JOIN `tabDaily Attendance Summary` s
+        ON s.employee = e.name AND s.attendance_date = %(date)s
+    LEFT JOIN `tabAttendance` a
+        ON a.employee = e.name AND a.attendance_date = %(date)s AND a.docstatus < 2
+    WHERE e.status = 'Active'
+      AND (e.date_of_joining IS NULL OR e.date_of_joining <= %(date)s)
+      AND {conditions}
+    ORDER BY e.name, a.docstatus DESC, a.creation
+"""
+
+
+# -----------------------------
+# Helpers
+# -----------------------------
+def _day_rows(d: datetime.date, department: Optional[str] = None, employees: Optional[List[str]] = None):
+    conditions, values = [], {"date": d}
+    if department is not None:
+        conditions.append("IFNULL(e.department, '') = %(department)s")
+        values["department"] = department
+    if employees is not None:
+        conditions.append("e.name IN %(employees)s")
+        values["employees"] = tuple(employees) or ("",)
+    query = DAY_QUERY.format(conditions=" AND ".join(conditions) or "1 = 1")
+    # An employee who already has several Attendance rows for the day keeps the first.
+    rows, seen = [], set()
+    for r in frappe.db.sql(query, values, as_dict=True):
+        if r.employee not in seen:
+            seen.add(r.employee)
+            rows.append(r)
+    return rows
+
+
+def _grace_periods() -> Dict[str, datetime.timedelta]:
+    """late_entry_grace_period per Shift Type, as a timedelta."""
+    return {
+        name: datetime.timedelta(minutes=int(grace or 0))
+        for name, grace in frappe.db.sql("SELECT name, late_entry_grace_period FROM `tabShift Type`")
+    }
+
+
+def _existing_attendance(employees: List[str], d: datetime.date) -> set:
+    """Employees that already have a draft or submitted Attendance on `d`."""
+    if not employees:
+        return set()
+    return set(
+        frappe.db.sql_list(
+            """
+            SELECT DISTINCT employee FROM `tabAttendance`
+            WHERE employee IN %(employees)s AND attendance_date = %(date)s AND docstatus < 2
+            """,
+            {"employees": tuple(employees), "date": d},
+        )
+    )
+
+
+def _compute(rows: List[Dict[str, Any]], d: datetime.date) -> List[Dict[str, Any]]:
+    """
+    Attendance values for each employee row. Holidays without punches are
+    skipped, as are would-be Absent days covered by a leave still Open: HRMS
+    marks those once the leave is decided.
+    """
+    if not rows:
+        return []
+    employees = tuple(sorted(r.employee for r in rows))
+    leaves = load_leave_index(employees, d, d)
+    open_leaves = load_leave_index(employees, d, d, ("Open",))
+    shifts = get_shift_resolver(d, d)
+    grace = _grace_periods()
+
+    result = []
+    for r in rows:
+        leave = leaves.leave_on(r.employee, d)
+        first_in = get_datetime(r.first_in) if r.first_in else None
+        if r.holiday and not first_in:
+            continue
+        if not leave and not first_in and open_leaves.leave_on(r.employee, d):
+            continue
+
+        status, leave_type = ("Present" if first_in else "Absent"), None
+        if leave:
+            leave_type = leave.get("leave_type")
+            status = "Half Day" if leave.get("half_day") else "On Leave"
+
+        shift = shifts.shift_for(r.employee, d)
+        shift_start = shifts.shift_start(r.employee, d)
+        late_entry = int(bool(
+            first_in
+            and shift_start is not None
+            and first_in > get_datetime(d) + shift_start + grace.get(shift, datetime.timedelta(0))
+        ))
+
+        result.append({
+            "employee": r.employee,
+            "employee_name": r.employee_name,
+            "company": r.company,
+            "department": r.department,
+            "status": status,
+            "leave_type": leave_type,
+            "shift": shift,
+            "in_time": r.first_in,
+            "out_time": r.last_out,
+            "working_hours": r.total_hours or 0,
+            "late_entry": late_entry,
+            "attendance": r.attendance,
+            # Drafts and records backed by a leave / attendance request are not ours to rewrite
+            "manual": bool(r.leave_application or r.attendance_request or (r.attendance and r.attendance_docstatus != 1)),
+        })
+    return result
+
+
+def _insert(rows: List[Dict[str, Any]], d: datetime.date) -> int:
+    # Re-check right before writing: a desk entry or another job may have marked the day meanwhile.
+    existing = _existing_attendance([r["employee"] for r in rows], d)
+    rows = [r for r in rows if r["employee"] not in existing]
+    if not rows:
+        return 0
+    names = reserve_names("Attendance", len(rows))
+    series = frappe.get_meta("Attendance").get_field("naming_series")
+    naming_series = (series.options or "").split("\n")[0] if series else None
+    now = frappe.utils.now()
+
+    frappe.db.bulk_insert(
+        "Attendance",
+        INSERT_FIELDS,
+        [
+            (
+                name,
+                naming_series,
+                r["employee"],
+                r["employee_name"],
+                r["company"],
+                r["department"],
+                d,
+                r["status"],
+                r["leave_type"],
+                r["shift"],
+                r["in_time"],
+                r["out_time"],
+                r["working_hours"],
+                r["late_entry"],
+                1,
+                now,
+                now,
+                "Administrator",
+                "Administrator",
+            )
+            for name, r in zip(names, rows)
+        ],
+    )
+    return len(rows)
+
+
+def _update(rows: List[Dict[str, Any]]) -> int:
+    """Rewrite generated Attendance in place; records backed by a leave or attendance request are left alone."""
+    updated = 0
+    for r in rows:
+        if r["manual"]:
+            continue
+        frappe.db.set_value(
+            "Attendance",
+            r["attendance"],
+            {k: r[k] for k in ("status", "leave_type", "shift", "in_time", "out_time", "working_hours", "late_entry")},
+            update_modified=True,
+        )
+        updated += 1
+    return updated
+
+
+# -----------------------------
+# Dirty (employee, date) pairs
+# -----------------------------
+def mark_dirty(employee: str, dates: Iterable) -> None:
+    """Queue (employee, date) pairs for a targeted Attendance recompute."""
+    members = [f"{employee}|{getdate(d)}" for d in dates if d]
+    if employee and members:
+        frappe.cache().sadd(DIRTY_SET_KEY, *members)
+
+
+def on_checkin_regularised(doc, method=None):
+    """doc_events hook: an approved regularisation makes the punch's day(s) dirty."""
+    if doc.custom_status != "Approved" or not doc.has_value_changed("custom_status"):
+        return
+    before = doc.get_doc_before_save()
+    mark_dirty(doc.employee, [doc.time, before.time if before else None])
+
+
+def _pop_dirty() -> Dict[datetime.date, List[str]]:
+    # RedisWrapper.spop takes no count; pop a whole batch in one round trip.
+    members = frappe.cache().execute_command("SPOP", frappe.cache().make_key(DIRTY_SET_KEY), DIRTY_BATCH_SIZE) or []
+    by_date: Dict[datetime.date, List[str]] = defaultdict(list)
+    for m in members:
+        employee, _sep, d = (m.decode() if isinstance(m, bytes) else m).rpartition("|")
+        by_date[getdate(d)].append(employee)
+    return by_date
+
+
+# -----------------------------
+# Jobs
+# -----------------------------
+def generate_attendance_for_partition(attendance_date, department: str = NO_DEPARTMENT) -> int:
+    """Background job: bulk-insert missing Attendance of one department for one day."""
+    d = getdate(attendance_date)
+    rows = [r for r in _compute(_day_rows(d, department=department), d) if not r["attendance"]]
+    created = _insert(rows, d)
+    frappe.db.commit()
+    return created
+
+
+def generate_daily_attendance(attendance_date=None):
+    """
+    Nightly job: mark Attendance for `attendance_date` (default yesterday) from the
+    daily summary, fanning out one background job per department.
+    """
+    d = getdate(attendance_date) if attendance_date else add_days(getdate(today()), -1)
+    departments = frappe.db.sql(
+        "SELECT DISTINCT IFNULL(department, '') FROM `tabEmployee` WHERE status = 'Active'"
+    )
+    for (department,) in departments:
+        frappe.enqueue(
+            "fbts.api.attendance_generation.generate_attendance_for_partition",
+            queue="long",
+            timeout=1800,
+            job_id=f"fbts_attendance::{d}::{department or '-'}",
+            deduplicate=True,
+            attendance_date=d,
+            department=department,
+        )
+
+
+def recompute_dirty_attendance():
+    """
+    Recompute Attendance only for (employee, date) pairs touched by approved
+    regularisations. Pairs for today or later are dropped; the nightly job covers them.
+    """
+    current = getdate(today())
+    dirty = _pop_dirty()
+    try:
+        for d, employees in dirty.items():
+            if d >= current:
+                continue
+            rows = _compute(_day_rows(d, employees=sorted(set(employees))), d)
+            _update([r for r in rows if r["attendance"]])
+            _insert([r for r in rows if not r["attendance"]], d)
+        frappe.db.commit()
+    except Exception:
+        frappe.db.rollback()
+        for d, employees in dirty.items():
+            for employee in employees:
+                mark_dirty(employee, [d])
+        raise
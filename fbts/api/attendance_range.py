@@ -0,0 +1,180 @@
+from typing import Any, Dict, Optional
+
+import frappe
+import numpy as np
+from frappe.utils import date_diff, getdate
+
+from fbts.api.shift_resolver import get_shift_resolver
+
+MAX_RANGE_DAYS = 366
+PAYROLL_ROLES = ("HR Manager", "System Manager")
+US_PER_MINUTE = 60 * 1_000_000
+KEY_STRIDE = 10_000_000
+# MariaDB TO_DAYS(d) == date.toordinal() + 365
+TO_DAYS_OFFSET = 365
+
+
+# -----------------------------
+# Helpers
+# -----------------------------
+def _fetch_columns(from_date, to_date, employee: Optional[str], company: Optional[str]):
+    """Summary rows for active employees as column arrays, ordered by (employee, date)."""
+    conditions = ["s.attendance_date BETWEEN %(from_date)s AND %(to_date)s", "e.status = 'Active'"]
+    if employee:
+        conditions.append("s.employee = %(employee)s")
+    if company:
+        conditions.append("e.company = %(company)s")
+
+    rows = frappe.db.sql(
+        f"""
+        SELECT
+            s.employee,
+            TO_DAYS(s.attendance_date) AS day_no,
+            YEARWEEK(s.attendance_date, 3) AS iso_week,
+            TIMESTAMPDIFF(MICROSECOND, s.attendance_date, s.first_in) AS first_in_us,
+            s.total_hours
+        FROM `tabDaily Attendance Summary` s
+        INNER JOIN `tabEmployee` e ON e.name = s.employee
+        WHERE {" AND ".join(conditions)}
+        ORDER BY s.employee, s.attendance_date
+        """,
+        {"from_date": from_date, "to_date": to_date, "employee": employee, "company": company},
+        as_list=True,
+    )
+    if not rows:
+        return None
+
+    employees, day_no, iso_week, first_in_us, hours = zip(*rows)
+    return (
+        np.asarray(employees, dtype=object),
+        np.asarray(day_no, dtype=np.int64),
+        np.asarray(iso_week, dtype=np.int64),
+        np.asarray([-1 if v is None else v for v in first_in_us], dtype=np.int64),
+        np.asarray([np.nan if v is None else v for v in hours], dtype=np.float64),
+    )
+
+
+def _shift_start_per_row(emp_ids, emp_idx, day_no, from_date, to_date):
+    """
+    Resolve the date-effective shift start for every row at once: roster
+    entries are laid out as (employee, start day) keys and each row picks the
+    latest entry starting on or before its day, as ShiftResolver.shift_on does.
+    """
+    entries = []
+    for employee, rows in get_shift_resolver(from_date, to_date).entries().items():
+        i = np.searchsorted(emp_ids, employee)
+        if i >= len(emp_ids) or emp_ids[i] != employee:
+            continue
+        for start, end, _shift, start_time, _end_time in rows:
+            entries.append((
+                int(i),
+                start.toordinal() + TO_DAYS_OFFSET,
+                end.toordinal() + TO_DAYS_OFFSET if end else np.iinfo(np.int64).max,
+                -1 if start_time is None else int(start_time.total_seconds()) * 1_000_000,
+            ))
+
+    shift_us = np.full(len(emp_idx), -1, dtype=np.int64)
+    if not entries:
+        return shift_us
+
+    entries.sort(key=lambda e: (e[0], e[1]))
+    a_emp, a_start, a_end, a_shift = (np.asarray(col, dtype=np.int64) for col in zip(*entries))
+
+    entry_keys = a_emp * KEY_STRIDE + a_start
+    row_keys = emp_idx.astype(np.int64) * KEY_STRIDE + day_no
+    pos = np.searchsorted(entry_keys, row_keys, side="right") - 1
+
+    # step back over entries that ended before the row's day, for all rows at once
+    pending = pos >= 0
+    while pending.any():
+        safe = np.clip(pos, 0, None)
+        pending &= a_emp[safe] == emp_idx
+        hit = pending & (a_end[safe] >= day_no)
+        shift_us[hit] = a_shift[safe][hit]
+        pending &= ~hit
+        pos -= 1
+        pending &= pos >= 0
+    return shift_us
+
+
+# -----------------------------
+# Main API
+# -----------------------------
+@frappe.whitelist()
+def get_attendance_for_range(
+    from_date: str,
+    to_date: str,
+    employee: Optional[str] = None,
+    company: Optional[str] = None,
+    grace_minutes: int = 0,
+):
+    """
+    Payroll totals per active employee over [from_date, to_date]:
+      - late_days, late_minutes
+      - weekly_working_hours: {"YYYY-Www": float_hours}
+      - total_working_hours: float_hours
+
+    Late detection, grace and hour rounding follow the per-day loop in
+    fbts.api.monthly.get_employee_holiday_names exactly; the work is done
+    over column arrays instead of one Python iteration per day.
+    Restricted to HR Manager / System Manager.
+    """
+    frappe.only_for(PAYROLL_ROLES)
+
+    from_date, to_date = getdate(from_date), getdate(to_date)
+    if to_date < from_date:
+        frappe.throw("to_date must be on or after from_date", exc=frappe.ValidationError)
+    if date_diff(to_date, from_date) >= MAX_RANGE_DAYS:
+        frappe.throw(f"Date range cannot exceed {MAX_RANGE_DAYS} days", exc=frappe.ValidationError)
+
+    columns = _fetch_columns(from_date, to_date, employee, company)
+    if columns is None:
+        return {}
+    employees, day_no, iso_week, first_in_us, hours = columns
+
+    emp_ids, emp_idx = np.unique(employees, return_inverse=True)
+    n_emp = len(emp_ids)
+
+    # shift start per row, microseconds from midnight (-1 = no shift that day)
+    shift_us = _shift_start_per_row(emp_ids, emp_idx, day_no, from_date, to_date)
+
+    # late detection: cin > shift start + grace, minutes rounded half-to-even like round()
+    grace_us = int(grace_minutes or 0) * US_PER_MINUTE
+    late = (first_in_us >= 0) & (shift_us >= 0) & (first_in_us > shift_us + grace_us)
+    late_by = np.rint((first_in_us - shift_us) / 1e6 / 60.0).astype(np.int64)
+    late_days = np.bincount(emp_idx[late], minlength=n_emp)
+    late_minutes = np.bincount(emp_idx[late], weights=late_by[late], minlength=n_emp)
+
+    # hours: summed in (employee, date) order, same as the per-day loop
+    has_hours = ~np.isnan(hours)
+    total_hours = np.bincount(emp_idx[has_hours], weights=hours[has_hours], minlength=n_emp)
+
+    week_keys, week_idx = np.unique(
+        emp_idx[has_hours].astype(np.int64) * 1_000_000 + iso_week[has_hours], return_inverse=True
+    )
+    week_hours = np.bincount(week_idx, weights=hours[has_hours])
+
+    weekly: Dict[int, Dict[str, float]] = {i: {} for i in range(n_emp)}
+    for key, value in zip(week_keys.tolist(), week_hours.tolist()):
+        i, yw = divmod(key, 1_000_000)
+        weekly[i][f"{yw // 100}-W{yw % 100:02d}"] = round(value, 2)
+
+    names = dict(
+        frappe.db.get_all(
+            "Employee",
+            filters={"name": ["in", list(emp_ids)]},
+            fields=["name", "employee_name"],
+            as_list=True,
+        )
+    )
+
+    result: Dict[str, Dict[str, Any]] = {}
+    for i, emp_id in enumerate(emp_ids.tolist()):
+        result[emp_id] = {
+            "employee_name": names.get(emp_id),
+            "late_days": int(late_days[i]),
+            "late_minutes": int(late_minutes[i]),
+            "weekly_working_hours": weekly[i],
+            "total_working_hours": round(float(total_hours[i]), 2),
+        }
+    return result
@@ -0,0 +1,122 @@
+import base64
+import datetime
+import json
+import zlib
+from typing import Any, Dict, List, Optional
+
+import frappe
+from frappe.utils import add_days, add_months, get_first_day, getdate
+from frappe.utils.caching import request_cache
+
+SNAPSHOT_DOCTYPE = "Attendance Snapshot"
+FROZEN_UNTIL_KEY = "fbts_attendance_frozen_until"
+
+
+# -----------------------------
+# Encoding
+# -----------------------------
+def encode_payload(payload: Dict[str, Any]) -> str:
+    raw = json.dumps(payload, default=str, separators=(",", ":")).encode()
+    return base64.b64encode(zlib.compress(raw, 9)).decode()
+
+
+def decode_payload(blob: str) -> Dict[str, Any]:
+    return json.loads(zlib.decompress(base64.b64decode(blob)))
+
+
+# -----------------------------
+# Locked months
+# -----------------------------
+@request_cache
+def get_locked_until() -> Optional[datetime.date]:
+    """End date of the latest submitted Payroll Entry; attendance up to it is final."""
+    locked = frappe.db.sql("SELECT MAX(end_date) FROM `tabPayroll Entry` WHERE docstatus = 1")
+    return getdate(locked[0][0]) if locked and locked[0][0] else None
+
+
+def is_month_locked(month_start: datetime.date) -> bool:
+    locked_until = get_locked_until()
+    month_end = add_days(add_months(month_start, 1), -1)
+    return bool(locked_until) and month_end <= locked_until
+
+
+# -----------------------------
+# Read / write
+# -----------------------------
+def get_snapshots(emp_ids: List[str], month_start: datetime.date) -> Dict[str, Dict[str, Any]]:
+    """Decoded snapshots of `emp_ids` for the month (employees without one are omitted)."""
+    if not emp_ids:
+        return {}
+    rows = frappe.db.get_all(
+        SNAPSHOT_DOCTYPE,
+        filters={"employee": ["in", emp_ids], "month": month_start},
+        fields=["employee", "payload"],
+        limit=None,
+    )
+    return {r["employee"]: decode_payload(r["payload"]) for r in rows}
+
+
+def save_snapshots(month_start: datetime.date, payloads: Dict[str, Dict[str, Any]]) -> int:
+    """Bulk-insert snapshots for one month; existing (employee, month) rows are left untouched."""
+    if not payloads:
+        return 0
+    now = frappe.utils.now()
+    values = []
+    for employee, payload in payloads.items():
+        blob = encode_payload(payload)
+        values.append((
+            f"{employee}-{month_start}",
+            employee,
+            payload.get("employee_name"),
+            month_start,
+            blob,
+            len(blob),
+            now,
+            now,
+            "Administrator",
+            "Administrator",
+        ))
+    frappe.db.bulk_insert(
+        SNAPSHOT_DOCTYPE,
+        [
+            "name",
+            "employee",
+            "employee_name",
+            "month",
+            "payload",
+            "payload_size",
+            "creation",
+            "modified",
+            "owner",
+            "modified_by",
+        ],
+        values,
+        ignore_duplicates=True,
+    )
+    return len(values)
+
+
+def get_months_to_freeze(limit: int) -> List[datetime.date]:
+    """Locked months after the last fully frozen one (oldest first), at most `limit` of them."""
+    locked_until = get_locked_until()
+    if not locked_until:
+        return []
+
+    frozen_until = frappe.db.get_global(FROZEN_UNTIL_KEY)
+    if frozen_until:
+        cur = add_months(getdate(frozen_until), 1)
+    else:
+        first_day = frappe.db.sql("SELECT MIN(attendance_date) FROM `tabDaily Attendance Summary`")[0][0]
+        if not first_day:
+            return []
+        cur = get_first_day(getdate(first_day))
+
+    months = []
+    while len(months) < limit and is_month_locked(cur):
+        months.append(cur)
+        cur = add_months(cur, 1)
+    return months
+
+
+def mark_month_frozen(month_start: datetime.date) -> None:
+    frappe.db.set_global(FROZEN_UNTIL_KEY, str(month_start))
@@ -0,0 +1,220 @@
+import datetime
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional
+
+import frappe
+from frappe.utils import add_days, add_months, get_datetime, get_first_day, getdate
+
+from fbts.api.checkins import get_checkin_time_bounds, get_daily_checkin_bounds
+
+SUMMARY_DOCTYPE = "Daily Attendance Summary"
+UPSERT_CHUNK_SIZE = 500
+
+
+# -----------------------------
+# Helpers
+# -----------------------------
+def _hours_between(cin: Optional[datetime.datetime], cout: Optional[datetime.datetime]) -> Optional[float]:
+    """Worked hours between first IN and last OUT, rounded to 2 places."""
+    if cin and cout and cout > cin:
+        return round((cout - cin).total_seconds() / 3600.0, 2)
+    return None
+
+
+def _upsert_summary_rows(rows: List[Dict]) -> None:
+    """Insert or overwrite summary rows keyed by (employee, attendance_date)."""
+    now = frappe.utils.now()
+    user = frappe.session.user if getattr(frappe.local, "session", None) else "Administrator"
+
+    for i in range(0, len(rows), UPSERT_CHUNK_SIZE):
+        chunk = rows[i : i + UPSERT_CHUNK_SIZE]
+        values = []
+        for r in chunk:
+            d = getdate(r["attendance_date"])
+            values.append((
+                f"{r['employee']}-{d}",
+                r["employee"],
+                r.get("employee_name"),
+                d,
+                r.get("first_in"),
+                r.get("last_out"),
+                _hours_between(r.get("first_in"), r.get("last_out")),
+                r.get("checkin_count") or 0,
+                now,
+                now,
+                user,
+                user,
+            ))
+
+        placeholders = ", ".join(["(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"] * len(values))
+        frappe.db.sql(
+            f"""
+            INSERT INTO `tab{SUMMARY_DOCTYPE}`
+                (name, employee, employee_name, attendance_date, first_in, last_out,
+                 total_hours, checkin_count, creation, modified, owner, modified_by)
+            VALUES {placeholders}
+            ON DUPLICATE KEY UPDATE
+                employee_name = VALUES(employee_name),
+                first_in = VALUES(first_in),
+                last_out = VALUES(last_out),
+                total_hours = VALUES(total_hours),
+                checkin_count = VALUES(checkin_count),
+                modified = VALUES(modified),
+                modified_by = VALUES(modified_by)
+            """,
+            tuple(v for row in values for v in row),
+        )
+
+
+# -----------------------------
+# Maintenance
+# -----------------------------
+def refresh_daily_summary(employee: str, dates: Iterable) -> None:
+    """Recompute the summary rows of `employee` for each of `dates` from raw check-ins."""
+    if not employee:
+        return
+
+    for d in {getdate(d) for d in dates if d}:
+        rows = get_daily_checkin_bounds(d, d, employee=employee)
+        if rows:
+            _upsert_summary_rows(rows)
+        else:
+            frappe.db.delete(SUMMARY_DOCTYPE, {"employee": employee, "attendance_date": d})
+
+
+def add_punch_to_summary(employee: str, employee_name: Optional[str], time, log_type: Optional[str]) -> None:
+    """Fold one newly inserted punch into its day's summary row without re-reading check-ins."""
+    time = get_datetime(time)
+    d = time.date()
+    name = f"{employee}-{d}"
+    now = frappe.utils.now()
+    user = frappe.session.user if getattr(frappe.local, "session", None) else "Administrator"
+
+    # The upsert holds the row lock, so concurrent punches for the same day serialise here.
+    frappe.db.sql(
+        f"""
+        INSERT INTO `tab{SUMMARY_DOCTYPE}`
+            (name, employee, employee_name, attendance_date, first_in, last_out,
+             total_hours, checkin_count, creation, modified, owner, modified_by)
+        VALUES (%(name)s, %(employee)s, %(employee_name)s, %(date)s, %(first_in)s, %(last_out)s,
+                NULL, 1, %(now)s, %(now)s, %(user)s, %(user)s)
+        ON DUPLICATE KEY UPDATE
+            first_in = CASE WHEN VALUES(first_in) IS NULL THEN first_in
+                            ELSE LEAST(COALESCE(first_in, VALUES(first_in)), VALUES(first_in)) END,
+            last_out = CASE WHEN VALUES(last_out) IS NULL THEN last_out
+                            ELSE GREATEST(COALESCE(last_out, VALUES(last_out)), VALUES(last_out)) END,
+            checkin_count = checkin_count + 1,
+            modified = VALUES(modified),
+            modified_by = VALUES(modified_by)
+        """,
+        {
+            "name": name,
+            "employee": employee,
+            "employee_name": employee_name,
+            "date": d,
+            "first_in": time if log_type == "IN" else None,
+            "last_out": time if log_type == "OUT" else None,
+            "now": now,
+            "user": user,
+        },
+    )
+    first_in, last_out = frappe.db.get_value(SUMMARY_DOCTYPE, name, ["first_in", "last_out"])
+    frappe.db.set_value(
+        SUMMARY_DOCTYPE,
+        name,
+        "total_hours",
+        _hours_between(first_in and get_datetime(first_in), last_out and get_datetime(last_out)),
+        update_modified=False,
+    )
+
+
+def rebuild_daily_summary(from_date=None, to_date=None) -> None:
+    """Rebuild the summary table month by month for every employee (used for backfills)."""
+    if not from_date or not to_date:
+        earliest, latest = get_checkin_time_bounds()
+        if not earliest:
+            return
+        from_date = from_date or earliest
+        to_date = to_date or latest
+
+    window_start = get_first_day(getdate(from_date))
+    last_date = getdate(to_date)
+    while window_start <= last_date:
+        window_end = min(add_days(add_months(window_start, 1), -1), last_date)
+        frappe.db.delete(SUMMARY_DOCTYPE, {"attendance_date": ["between", [window_start, window_end]]})
+        _upsert_summary_rows(get_daily_checkin_bounds(window_start, window_end))
+        window_start = add_months(window_start, 1)
+
+
+def on_checkin_update(doc, method=None):
+    """doc_events hook: keep the (employee, day) summary in sync with Employee Checkin."""
+    before = doc.get_doc_before_save()
+    if before is None and method == "on_update" and doc.flags.get("checkin_state_synced"):
+        # Fresh tap from create_checkin: fold it in instead of re-aggregating the day.
+        add_punch_to_summary(doc.employee, doc.employee_name, doc.time, doc.log_type)
+        return
+
+    affected = [doc.time]
+    if before and before.employee != doc.employee:
+        # Reassigned punch: the previous employee's day loses it, whatever the time.
+        refresh_daily_summary(before.employee, [before.time or doc.time])
+    elif before and before.time and get_datetime(before.time) != get_datetime(doc.time):
+        affected.append(before.time)
+    refresh_daily_summary(doc.employee, affected)
+
+
+def on_checkin_delete(doc, method=None):
+    """doc_events hook (after_delete): drop the deleted punch from its day's summary."""
+    refresh_daily_summary(doc.employee, [doc.time])
+
+
+# -----------------------------
+# Readers
+# -----------------------------
+def get_daily_summary_map(
+    emp_ids: List[str], start: datetime.date, end: datetime.date
+) -> Dict[str, Dict[datetime.date, Dict[str, Any]]]:
+    """Return {employee: {date: {check_in, check_out, total_hours}}} for the range."""
+    summary_map: Dict[str, Dict[datetime.date, Dict[str, Any]]] = defaultdict(dict)
+    if not emp_ids:
+        return summary_map
+
+    rows = frappe.db.get_all(
+        SUMMARY_DOCTYPE,
+        filters={
+            "employee": ["in", emp_ids],
+            "attendance_date": ["between", [start, end]],
+        },
+        fields=["employee", "attendance_date", "first_in", "last_out", "total_hours"],
+        limit=None,
+    )
+    for r in rows:
+        summary_map[r["employee"]][getdate(r["attendance_date"])] = {
+            "check_in": r.get("first_in"),
+            "check_out": r.get("last_out"),
+            "total_hours": _hours_between(r.get("first_in"), r.get("last_out")),
+        }
+    return summary_map
+
+
+def get_recent_attendance_days(employee: str, n: int = 10, from_date=None, to_date=None) -> List[Dict[str, Any]]:
+    """
+    The `n` most recent days with punches for `employee`, newest first, optionally
+    bounded to [from_date, to_date]. Reads at most `n` rows of the
+    (employee, attendance_date) index, whatever the employee's history length.
+    """
+    filters: Dict[str, Any] = {"employee": employee}
+    if from_date and to_date:
+        filters["attendance_date"] = ["between", [getdate(from_date), getdate(to_date)]]
+    elif from_date:
+        filters["attendance_date"] = [">=", getdate(from_date)]
+    elif to_date:
+        filters["attendance_date"] = ["<=", getdate(to_date)]
+
+    return frappe.db.get_all(
+        SUMMARY_DOCTYPE,
+        filters=filters,
+        fields=["attendance_date", "first_in", "last_out"],
+        order_by="attendance_date desc",
+        limit=int(n),
+    )
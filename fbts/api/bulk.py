@@ -0,0 +1,47 @@
+from typing import List
+
+import frappe
+from frappe.model.naming import NamingSeries
+
+
+def _naming_series_for(doctype: str):
+    """The numbered series used to name `doctype`, or None if it is not series-named."""
+    meta = frappe.get_meta(doctype)
+    autoname = (meta.autoname or "").strip()
+    if autoname.startswith("naming_series:"):
+        field = meta.get_field("naming_series")
+        autoname = (field.options or "").split("\n")[0] if field else ""
+        if autoname and "#" not in autoname:
+            autoname = autoname.rstrip(".") + ".#####"  # as frappe.model.naming.make_autoname does
+    if not autoname or "#" not in autoname or not autoname.rstrip(".").endswith("#"):
+        return None
+    return autoname
+
+
+def reserve_names(doctype: str, count: int) -> List[str]:
+    """
+    Reserve `count` consecutive names for `doctype` with one counter update.
+
+    For series-named doctypes the tabSeries row is bumped by `count` in a
+    single statement (the row lock is held until commit, as with getseries);
+    anything else falls back to random hashes.
+    """
+    if count <= 0:
+        return []
+
+    series = _naming_series_for(doctype)
+    if not series:
+        return [frappe.generate_hash(length=10) for _ in range(count)]
+
+    prefix = NamingSeries(series).get_prefix()
+    digits = len(series.rstrip(".")) - len(series.rstrip(".").rstrip("#"))
+
+    frappe.db.sql(
+        """
+        INSERT INTO `tabSeries` (`name`, `current`) VALUES (%(prefix)s, %(count)s)
+        ON DUPLICATE KEY UPDATE `current` = `current` + %(count)s
+        """,
+        {"prefix": prefix, "count": count},
+    )
+    end = frappe.db.sql("SELECT `current` FROM `tabSeries` WHERE `name` = %s", prefix)[0][0]
+    return [f"{prefix}{str(n).zfill(digits)}" for n in range(end - count + 1, end + 1)]
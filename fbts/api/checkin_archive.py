@@ -0,0 +1,123 @@
+import datetime
+from typing import Optional
+
+import frappe
+from frappe.utils import add_days, add_months, cint, get_first_day, getdate, today
+
+from fbts.api.attendance_summary import rebuild_daily_summary
+from fbts.api.checkins import ARCHIVE_TABLE, ARCHIVED_UNTIL_KEY, CHECKIN_TABLE, get_archived_until
+
+HORIZON_CONF_KEY = "fbts_checkin_archive_months"
+DEFAULT_HORIZON_MONTHS = 12
+ARCHIVE_MONTHS_PER_RUN = 3
+ARCHIVE_CHUNK_SIZE = 2000
+
+# Punches with a regularisation still awaiting a decision stay hot until it is decided.
+ARCHIVABLE_CONDITION = "time >= %(start)s AND time < %(end)s AND IFNULL(custom_status, '') != 'Open'"
+
+# Columns copied verbatim; the archive keeps the original document name.
+ARCHIVE_COLUMNS = [
+    ("name", "name"),
+    ("employee", "employee"),
+    ("employee_name", "employee_name"),
+    ("log_type", "log_type"),
+    ("time", "time"),
+    ("device_id", "device_id"),
+    ("shift", "shift"),
+    ("latitude", "latitude"),
+    ("longitude", "longitude"),
+    ("geofence_status", "custom_geofence_status"),
+    ("geofence_site", "custom_geofence_site"),
+    ("regularise_time", "custom_regularise_time"),
+    ("regularise_approver", "custom_regularise_approver"),
+    ("regularise_status", "custom_status"),
+    ("creation", "creation"),
+    ("modified", "modified"),
+    ("owner", "owner"),
+    ("modified_by", "modified_by"),
+]
+
+
+# -----------------------------
+# Helpers
+# -----------------------------
+def get_archive_cutoff() -> Optional[datetime.date]:
+    """First day of the oldest month kept hot; 0 months in site config disables archival."""
+    months = cint(frappe.conf.get(HORIZON_CONF_KEY, DEFAULT_HORIZON_MONTHS))
+    return get_first_day(add_months(getdate(today()), -months)) if months > 0 else None
+
+
+def _archive_range(start: datetime.date, end: datetime.date) -> None:
+    """
+    Summarise [start, end) from raw punches, then move its check-ins into the
+    archive in chunks of ARCHIVE_CHUNK_SIZE, committing after each so row locks
+    on the hot table stay short. Rows are picked through time_index and moved
+    by primary key.
+    """
+    rebuild_daily_summary(start, add_days(end, -1))
+    frappe.db.commit()
+
+    values = {"start": start, "end": end, "limit": ARCHIVE_CHUNK_SIZE}
+    target = ", ".join(f"`{col}`" for col, _src in ARCHIVE_COLUMNS)
+    source = ", ".join(f"`{src}`" for _col, src in ARCHIVE_COLUMNS)
+    while True:
+        names = frappe.db.sql_list(
+            f"SELECT name FROM {CHECKIN_TABLE} WHERE {ARCHIVABLE_CONDITION} ORDER BY time LIMIT %(limit)s",
+            values,
+        )
+        if not names:
+            break
+        chunk = {"names": tuple(names), "now": frappe.utils.now()}
+        frappe.db.sql(
+            f"""
+            INSERT IGNORE INTO {ARCHIVE_TABLE} ({target}, `archived_on`)
+            SELECT {source}, %(now)s
+            FROM {CHECKIN_TABLE}
+            WHERE name IN %(names)s
+            """,
+            chunk,
+        )
+        frappe.db.sql(f"DELETE FROM {CHECKIN_TABLE} WHERE name IN %(names)s", chunk)
+        frappe.db.commit()
+
+    archived_until = get_archived_until()
+    if not archived_until or end > archived_until:
+        frappe.db.set_global(ARCHIVED_UNTIL_KEY, str(end))
+
+
+# -----------------------------
+# Scheduled jobs
+# -----------------------------
+def archive_old_checkins():
+    """
+    Move check-ins older than the horizon (site config `fbts_checkin_archive_months`,
+    default 12) into Employee Checkin Archive, a month at a time in committed chunks.
+
+    Each month's daily summary is rebuilt first, so attendance reads keep
+    working off the summary. Late backfills into an archived month, and
+    punches whose regularisation was still Open, are swept up on a later run.
+    """
+    cutoff = get_archive_cutoff()
+    if not cutoff:
+        return
+
+    oldest = frappe.db.sql(
+        f"SELECT MIN(time) FROM {CHECKIN_TABLE} WHERE time < %(cutoff)s AND IFNULL(custom_status, '') != 'Open'",
+        {"cutoff": cutoff},
+    )[0][0]
+    if not oldest:
+        return
+
+    month = get_first_day(getdate(oldest))
+    for _i in range(ARCHIVE_MONTHS_PER_RUN):
+        if month >= cutoff:
+            break
+        try:
+            _archive_range(month, add_months(month, 1))
+            frappe.db.commit()
+        except Exception:
+            # Chunks already committed stay archived; the rest is retried next run.
+            frappe.db.rollback()
+            frappe.log_error(frappe.get_traceback(), f"Check-in archival failed for {month:%Y-%m}")
+            break
+        month = add_months(month, 1)
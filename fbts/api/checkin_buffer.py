@@ -0,0 +1,204 @@
+import os
+import socket
+import time as _time
+from typing import Any, Dict, List, Optional, Tuple
+
+import frappe
+from frappe.utils.background_jobs import get_redis_conn
+
+from fbts.api.checkin_ingest import insert_punches
+
+WRITE_BEHIND_CONF_KEY = "fbts_checkin_write_behind"
+STREAM_NAME = "fbts:checkin_stream"
+CONSUMER_GROUP = "fbts_checkin_flusher"
+FLUSH_BATCH_SIZE = 500
+FLUSH_TIME_BUDGET = 50  # seconds; the flusher runs every minute
+CLAIM_IDLE_MS = 5 * 60 * 1000  # entries left pending this long by a dead worker are retried
+PUNCH_FIELDS = ("employee", "time", "log_type", "device_id", "latitude", "longitude")
+PENDING_PUNCH_PREFIX = "fbts:checkin_pending"
+PENDING_PUNCH_TTL = 2 * 24 * 60 * 60
+
+# KEYS[1] = pending-punch key, ARGV[1] = flushed "log_type|time"
+# Clears the marker only if no newer punch was queued since.
+_CLEAR_PENDING_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+# -----------------------------
+# Helpers
+# -----------------------------
+def is_write_behind_enabled() -> bool:
+    """Site config flag `fbts_checkin_write_behind`."""
+    return bool(frappe.conf.get(WRITE_BEHIND_CONF_KEY))
+
+
+def _conn():
+    # The queue Redis persists RQ jobs, unlike the cache instance which may be flushed.
+    return get_redis_conn()
+
+
+def _stream_key() -> str:
+    return f"{frappe.local.site}:{STREAM_NAME}"
+
+
+def _pending_key(employee: str) -> str:
+    return f"{frappe.local.site}:{PENDING_PUNCH_PREFIX}:{employee}"
+
+
+def _clear_pending_script(conn):
+    script = getattr(frappe.local, "fbts_clear_pending_script", None)
+    if script is None:
+        script = frappe.local.fbts_clear_pending_script = conn.register_script(_CLEAR_PENDING_SCRIPT)
+    return script
+
+
+def _consumer_name() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def _ensure_group(conn) -> None:
+    try:
+        conn.xgroup_create(_stream_key(), CONSUMER_GROUP, id="0", mkstream=True)
+    except Exception as e:
+        if "BUSYGROUP" not in str(e):
+            raise
+
+
+def _decode_entries(entries) -> Tuple[List[bytes], List[Dict[str, Any]]]:
+    ids, punches = [], []
+    for entry_id, fields in entries or []:
+        if not fields:  # trimmed or deleted while pending
+            ids.append(entry_id)
+            continue
+        punch = {
+            (k.decode() if isinstance(k, bytes) else k): (v.decode() if isinstance(v, bytes) else v)
+            for k, v in fields.items()
+        }
+        ids.append(entry_id)
+        punches.append({k: (punch.get(k) or None) for k in PUNCH_FIELDS})
+    return ids, punches
+
+
+def _flush_entries(conn, entries) -> int:
+    """Insert one batch and acknowledge it only after the commit."""
+    ids, punches = _decode_entries(entries)
+    if not ids:
+        return 0
+    try:
+        results = insert_punches(punches, sync_state=False)
+        frappe.db.commit()
+    except Exception:
+        frappe.db.rollback()
+        frappe.log_error(frappe.get_traceback(), "Check-in buffer flush failed")
+        return 0
+
+    errors = [r for r in results if r["status"] == "error"]
+    if errors:
+        frappe.log_error(frappe.as_json(errors), "Check-in buffer: rejected punches")
+
+    conn.xack(_stream_key(), CONSUMER_GROUP, *ids)
+    conn.xdel(_stream_key(), *ids)
+    clear_pending = _clear_pending_script(conn)
+    for p in punches:
+        clear_pending(keys=[_pending_key(p["employee"])], args=[f"{p['log_type']}|{p['time']}"])
+    return len(ids)
+
+
+# -----------------------------
+# Producer
+# -----------------------------
+def append_punch(employee: str, time, log_type: str, device_id: str, latitude=None, longitude=None) -> str:
+    """
+    Append a punch to the stream; returns the stream entry id. The employee's
+    latest queued punch is also kept until it is flushed, so the IN/OUT state
+    can be rebuilt while the punch is not in the DB yet (see get_pending_punch).
+    """
+    pipe = _conn().pipeline()
+    pipe.xadd(
+        _stream_key(),
+        {
+            "employee": employee,
+            "time": str(time),
+            "log_type": log_type,
+            "device_id": device_id,
+            "latitude": "" if latitude is None else str(latitude),
+            "longitude": "" if longitude is None else str(longitude),
+        },
+    )
+    pipe.set(_pending_key(employee), f"{log_type}|{time}", ex=PENDING_PUNCH_TTL)
+    entry_id = pipe.execute()[0]
+    return entry_id.decode() if isinstance(entry_id, bytes) else entry_id
+
+
+def get_pending_punch(employee: str) -> Optional[Dict[str, Any]]:
+    """{"log_type", "time"} of the employee's latest punch still waiting in the stream, else None."""
+    value = _conn().get(_pending_key(employee))
+    if not value:
+        return None
+    log_type, _sep, time = (value.decode() if isinstance(value, bytes) else value).partition("|")
+    return {"log_type": log_type, "time": time}
+
+
+# -----------------------------
+# Scheduled jobs
+# -----------------------------
+def flush_checkin_buffer():
+    """
+    Drain the check-in stream into `tabEmployee Checkin` (scheduled every minute).
+
+    Delivery is at-least-once: entries are acknowledged after their batch
+    commits, entries abandoned by a crashed worker are reclaimed after
+    CLAIM_IDLE_MS, and replays are absorbed by the ingest dedupe on
+    (employee, time, device_id).
+    """
+    conn = _conn()
+    if not is_write_behind_enabled() and not conn.exists(_stream_key()):
+        return 0  # disabled, and no backlog left over from when it was enabled
+    _ensure_group(conn)
+    stream, consumer = _stream_key(), _consumer_name()
+    deadline = _time.monotonic() + FLUSH_TIME_BUDGET
+    flushed = 0
+
+    start_id = "0-0"
+    while _time.monotonic() < deadline:
+        claimed = conn.xautoclaim(
+            stream, CONSUMER_GROUP, consumer, min_idle_time=CLAIM_IDLE_MS, start_id=start_id, count=FLUSH_BATCH_SIZE
+        )
+        start_id, entries = claimed[0], claimed[1]
+        flushed += _flush_entries(conn, entries)
+        if start_id in (b"0-0", "0-0"):
+            break
+
+    while _time.monotonic() < deadline:
+        response = conn.xreadgroup(CONSUMER_GROUP, consumer, {stream: ">"}, count=FLUSH_BATCH_SIZE)
+        if not response:
+            break
+        batch = _flush_entries(conn, response[0][1])
+        if not batch:
+            break  # DB trouble: leave the rest pending for the next run
+        flushed += batch
+
+    return flushed
+
+
+# -----------------------------
+# Monitoring
+# -----------------------------
+@frappe.whitelist()
+def get_checkin_buffer_stats():
+    """Stream length and pending (delivered, not yet committed) count of the check-in buffer."""
+    frappe.only_for("System Manager")
+    conn = _conn()
+    if not conn.exists(_stream_key()):
+        return {"enabled": is_write_behind_enabled(), "length": 0, "pending": 0}
+    _ensure_group(conn)
+    pending = conn.xpending(_stream_key(), CONSUMER_GROUP)
+    return {
+        "enabled": is_write_behind_enabled(),
+        "length": conn.xlen(_stream_key()),
+        "pending": pending.get("pending", 0) if isinstance(pending, dict) else 0,
+    }
@@ -0,0 +1,254 @@
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+import frappe
+from frappe import _
+from frappe.utils import get_datetime
+
+from fbts.api.attendance_cache import invalidate_employee_months
+from fbts.api.attendance_summary import refresh_daily_summary
+from fbts.api.bulk import reserve_names
+from fbts.api.checkin_state import forget_state
+from fbts.api.checkins import get_archived_until, on_archive
+from fbts.api.geofence import locate
+from fbts.api.presence import record_punches
+from fbts.api.shift_resolver import get_shift_resolver
+
+MAX_PUNCHES_PER_CALL = 1000
+# Gateways and sync jobs authenticate as an API user holding one of these.
+INGEST_ROLES = ("HR User", "HR Manager", "System Manager")
+DEFAULT_DEVICE_ID = "WebApp"
+INSERT_FIELDS = [
+    "name",
+    "employee",
+    "employee_name",
+    "log_type",
+    "time",
+    "device_id",
+    "latitude",
+    "longitude",
+    "shift",
+    "custom_geofence_status",
+    "custom_geofence_site",
+    "creation",
+    "modified",
+    "owner",
+    "modified_by",
+]
+
+EXISTING_WINDOW_QUERY = """
+    SELECT employee, time, device_id, log_type
+    FROM `tabEmployee Checkin`
+    WHERE employee IN %(employees)s AND time >= %(start)s AND time <= %(end)s
+"""
+
+EXISTING_PREVIOUS_QUERY = """
+    SELECT c.employee, c.time, c.device_id, c.log_type
+    FROM `tabEmployee Checkin` c
+    INNER JOIN (
+        SELECT employee, MAX(time) AS time
+        FROM `tabEmployee Checkin`
+        WHERE employee IN %(employees)s AND time < %(start)s
+        GROUP BY employee
+    ) last ON last.employee = c.employee AND last.time = c.time
+"""
+
+
+# -----------------------------
+# Helpers
+# -----------------------------
+def _parse_punch(index: int, punch: Any) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """Normalise one raw punch; returns (punch, error_message)."""
+    if not isinstance(punch, dict):
+        return None, "Punch must be an object"
+    if not punch.get("employee"):
+        return None, "employee is required"
+    if not punch.get("time"):
+        return None, "time is required"
+    try:
+        time = get_datetime(punch["time"])
+    except Exception:
+        return None, f"Invalid time: {punch['time']}"
+
+    log_type = (punch.get("log_type") or "").upper() or None
+    if log_type not in (None, "IN", "OUT"):
+        return None, "log_type must be IN or OUT"
+
+    return {
+        "index": index,
+        "employee": punch["employee"],
+        "time": time,
+        "device_id": punch.get("device_id") or DEFAULT_DEVICE_ID,
+        "log_type": log_type,
+        "latitude": punch.get("latitude"),
+        "longitude": punch.get("longitude"),
+    }, None
+
+
+def _existing_checkins(employees: List[str], start, end) -> List[Dict[str, Any]]:
+    """Check-ins of `employees` in [start, end], plus each one's last check-in before `start`."""
+    values = {"employees": tuple(employees), "start": start, "end": end}
+    queries = [EXISTING_WINDOW_QUERY, EXISTING_PREVIOUS_QUERY]
+    archived_until = get_archived_until()
+    if archived_until and get_datetime(start).date() < archived_until:
+        queries += [on_archive(EXISTING_WINDOW_QUERY), on_archive(EXISTING_PREVIOUS_QUERY)]
+
+    rows = []
+    for query in queries:
+        rows += frappe.db.sql(query, values, as_dict=True)
+    return rows
+
+
+def _assign_log_types(accepted: List[Dict[str, Any]], existing: List[Dict[str, Any]]) -> None:
+    """Fill missing log_type by toggling from the punch that precedes it in time."""
+    timeline: Dict[str, List[Tuple[Any, int, Dict[str, Any]]]] = defaultdict(list)
+    for row in existing:
+        timeline[row["employee"]].append((get_datetime(row["time"]), 0, row))
+    for punch in accepted:
+        timeline[punch["employee"]].append((punch["time"], 1, punch))
+
+    for entries in timeline.values():
+        entries.sort(key=lambda e: (e[0], e[1]))
+        previous = None
+        for _time, _is_new, row in entries:
+            if not row.get("log_type"):
+                row["log_type"] = "OUT" if previous == "IN" else "IN"
+            previous = row["log_type"]
+
+
+def apply_checkin_side_effects(rows: List[Dict[str, Any]], sync_state: bool = True) -> None:
+    """
+    What the Employee Checkin doc_events would have done for rows written in bulk.
+
+    `sync_state=False` leaves the Redis IN/OUT state alone, for punches that
+    were already toggled through it (the write-behind buffer).
+    """
+    touched = defaultdict(set)
+    for row in rows:
+        touched[row["employee"]].add(get_datetime(row["time"]).date())
+    for employee, dates in touched.items():
+        refresh_daily_summary(employee, dates)
+        invalidate_employee_months(employee, min(dates), max(dates))
+        if sync_state:
+            forget_state(employee)
+
+
+def insert_punches(punches: List[Any], sync_state: bool = True) -> List[Dict[str, Any]]:
+    """
+    Validate, dedupe and bulk-insert `punches`; returns one result per input row.
+
+    Does not commit. Punches already recorded for the same (employee, time,
+    device_id), in the DB or earlier in the batch, are reported as
+    duplicates, so replaying a batch is harmless.
+    """
+    results: List[Optional[Dict[str, Any]]] = [None] * len(punches)
+    parsed = []
+    for i, raw in enumerate(punches):
+        punch, error = _parse_punch(i, raw)
+        if error:
+            results[i] = {"index": i, "status": "error", "message": error}
+        else:
+            parsed.append(punch)
+
+    employee_names = dict(
+        frappe.db.get_all(
+            "Employee",
+            filters={"name": ["in", list({p["employee"] for p in parsed}) or [""]]},
+            fields=["name", "employee_name"],
+            as_list=True,
+        )
+    )
+
+    accepted = []
+    seen = set()
+    if parsed:
+        existing = _existing_checkins(
+            list(employee_names) or [""], min(p["time"] for p in parsed), max(p["time"] for p in parsed)
+        )
+        seen = {(r["employee"], get_datetime(r["time"]), r["device_id"]) for r in existing}
+    for punch in parsed:
+        key = (punch["employee"], punch["time"], punch["device_id"])
+        if punch["employee"] not in employee_names:
+            results[punch["index"]] = {"index": punch["index"], "status": "error", "message": "Unknown employee"}
+        elif key in seen:
+            results[punch["index"]] = {"index": punch["index"], "status": "duplicate"}
+        else:
+            seen.add(key)
+            accepted.append(punch)
+
+    if accepted:
+        _assign_log_types(accepted, existing)
+        shifts = get_shift_resolver(min(p["time"] for p in accepted).date(), max(p["time"] for p in accepted).date())
+        names = reserve_names("Employee Checkin", len(accepted))
+        now, user = frappe.utils.now(), frappe.session.user
+
+        values = []
+        for name, punch in zip(names, accepted):
+            punch["name"] = name
+            geofence_status, geofence_site = locate(punch["latitude"], punch["longitude"])
+            values.append((
+                name,
+                punch["employee"],
+                employee_names[punch["employee"]],
+                punch["log_type"],
+                punch["time"],
+                punch["device_id"],
+                punch["latitude"],
+                punch["longitude"],
+                shifts.shift_for(punch["employee"], punch["time"].date()),
+                geofence_status,
+                geofence_site,
+                now,
+                now,
+                user,
+                user,
+            ))
+            results[punch["index"]] = {
+                "index": punch["index"],
+                "status": "created",
+                "name": name,
+                "log_type": punch["log_type"],
+            }
+
+        frappe.db.bulk_insert("Employee Checkin", INSERT_FIELDS, values)
+        apply_checkin_side_effects(accepted, sync_state=sync_state)
+        record_punches(accepted)
+
+    return results
+
+
+# -----------------------------
+# Main API
+# -----------------------------
+@frappe.whitelist()
+def ingest_checkins(punches):
+    """
+    Bulk check-in ingestion for biometric gateways and offline PWA sync.
+
+    `punches` is a list (or JSON string) of
+      {"employee", "time", "device_id"?, "log_type"?, "latitude"?, "longitude"?}
+
+    Valid punches are written with one bulk insert in a single transaction.
+    Punches already recorded for the same (employee, time, device_id), in
+    the DB or earlier in the batch, are reported as duplicates; missing
+    log_types are toggled in time order. Returns one result per input row:
+      {"index", "status": "created" | "duplicate" | "error", "name"?, "log_type"?, "message"?}
+
+    Punches are written for any employee, so callers need one of INGEST_ROLES.
+    """
+    frappe.only_for(INGEST_ROLES)
+    punches = frappe.parse_json(punches) if isinstance(punches, str) else punches
+    if not isinstance(punches, list):
+        frappe.throw(_("punches must be a list"), exc=frappe.ValidationError)
+    if len(punches) > MAX_PUNCHES_PER_CALL:
+        frappe.throw(_("At most {0} punches per call").format(MAX_PUNCHES_PER_CALL), exc=frappe.ValidationError)
+
+    results = insert_punches(punches)
+    frappe.db.commit()
+
+    return {
+        "created": sum(1 for r in results if r["status"] == "created"),
+        "duplicates": sum(1 for r in results if r["status"] == "duplicate"),
+        "errors": sum(1 for r in results if r["status"] == "error"),
+        "results": results,
+    }
@@ -0,0 +1,110 @@
+from typing import Dict, Optional, Tuple
+
+import frappe
+from frappe.utils import get_datetime
+
+from fbts.api.checkins import get_last_checkin
+
+STATE_PREFIX = "fbts:checkin_state"
+STATE_TTL = 2 * 24 * 60 * 60  # rebuilt from the DB after two idle days
+NO_STATE = "NONE"
+
+# KEYS[1] = state key, ARGV[1] = punch time, ARGV[2] = ttl
+# Flips IN <-> OUT atomically; returns false when the key must be seeded first.
+_TOGGLE_SCRIPT = """
+local cur = redis.call('GET', KEYS[1])
+if not cur then
+    return false
+end
+local sep = string.find(cur, '|', 1, true)
+local last = string.sub(cur, 1, sep - 1)
+local nxt = 'IN'
+if last == 'IN' then
+    nxt = 'OUT'
+end
+redis.call('SET', KEYS[1], nxt .. '|' .. ARGV[1], 'EX', tonumber(ARGV[2]))
+return {last, nxt}
+"""
+
+
+# -----------------------------
+# Helpers
+# -----------------------------
+def _key(employee: str) -> str:
+    return frappe.cache().make_key(f"{STATE_PREFIX}:{employee}")
+
+
+def _encode(log_type: Optional[str], time) -> str:
+    return f"{log_type or NO_STATE}|{time or ''}"
+
+
+def _decode(value) -> Tuple[Optional[str], Optional[str]]:
+    if isinstance(value, bytes):
+        value = value.decode()
+    log_type, _sep, time = value.partition("|")
+    return (None if log_type == NO_STATE else log_type), (time or None)
+
+
+def _toggle_script():
+    script = getattr(frappe.local, "fbts_toggle_script", None)
+    if script is None:
+        script = frappe.local.fbts_toggle_script = frappe.cache().register_script(_TOGGLE_SCRIPT)
+    return script
+
+
+def _seed(employee: str) -> None:
+    """
+    Load the employee's state from the DB, or from their latest write-behind
+    punch if that is newer and not flushed yet. A concurrent seed that got
+    there first wins.
+    """
+    # Imported here: checkin_buffer -> checkin_ingest -> checkin_state
+    from fbts.api.checkin_buffer import get_pending_punch
+
+    last = get_last_checkin(employee)
+    pending = get_pending_punch(employee)
+    if pending and (not last.get("time") or get_datetime(pending["time"]) >= get_datetime(last["time"])):
+        last = pending
+    frappe.cache().set(_key(employee), _encode(last.get("log_type"), last.get("time")), ex=STATE_TTL, nx=True)
+
+
+# -----------------------------
+# Public
+# -----------------------------
+def toggle_state(employee: str, time) -> Tuple[Optional[str], str]:
+    """Atomically flip the presence state of `employee`; returns (previous, new) log types."""
+    for _attempt in range(2):
+        flipped = _toggle_script()(keys=[_key(employee)], args=[str(time), STATE_TTL])
+        if flipped:
+            previous, new = (v.decode() if isinstance(v, bytes) else v for v in flipped)
+            return (None if previous == NO_STATE else previous), new
+        _seed(employee)
+    frappe.throw(f"Could not resolve check-in state for {employee}")
+
+
+def get_state(employee: str) -> Dict:
+    """{"employee", "time", "log_type"} of the latest punch, or {} if there is none."""
+    value = frappe.cache().get(_key(employee))
+    if value is None:
+        _seed(employee)
+        value = frappe.cache().get(_key(employee))
+    if value is None:
+        return {}
+    log_type, time = _decode(value)
+    return {"employee": employee, "time": time, "log_type": log_type} if log_type else {}
+
+
+def forget_state(employee: str) -> None:
+    """Drop the cached state; the next read or toggle rebuilds it from the DB."""
+    if employee:
+        frappe.cache().delete(_key(employee))
+
+
+def on_checkin_change(doc, method=None):
+    """doc_events hook: punches not written through toggle_state invalidate the cached state."""
+    if doc.flags.get("checkin_state_synced"):
+        return
+    forget_state(doc.employee)
+    before = doc.get_doc_before_save() if method != "after_delete" else None
+    if before and before.employee != doc.employee:
+        forget_state(before.employee)
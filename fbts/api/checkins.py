@@ -0,0 +1,163 @@
+import datetime
+from typing import Dict, List, Optional, Tuple
+
+import frappe
+from frappe.utils import add_days, getdate
+from frappe.utils.caching import request_cache
+
+# Readers of `tabEmployee Checkin` in fbts.api go through the queries below,
+# except for a few that live next to their only caller:
+#   - fbts.api.anomalies: DAY_CHECKINS_QUERY, CHANGED_PAIRS_QUERY
+#   - fbts.api.checkin_ingest: EXISTING_WINDOW_QUERY, EXISTING_PREVIOUS_QUERY
+# All of them are written so that these indexes can serve them (most from
+# fbts.patches.add_employee_checkin_indexes):
+#   - employee_time_index        (employee, time)
+#   - time_index                 (time), for org-wide day ranges
+#   - regularise_approver_index  (custom_regularise_approver, custom_status, time)
+#   - geofence_status_index      (custom_geofence_status, employee, time), from
+#     fbts.patches.add_geofence_status_index
+#   - creation_index             (creation), from
+#     fbts.patches.add_employee_checkin_creation_index
+# fbts/tests/test_checkin_indexes.py EXPLAINs each one.
+#
+# Check-ins older than the archive boundary live in `tabEmployee Checkin
+# Archive` (see fbts.api.checkin_archive); the per-employee readers fall back
+# to it with the same query text, served by its own (employee, time) index.
+
+CHECKIN_TABLE = "`tabEmployee Checkin`"
+ARCHIVE_TABLE = "`tabEmployee Checkin Archive`"
+ARCHIVED_UNTIL_KEY = "fbts_checkin_archived_until"
+
+LAST_CHECKIN_QUERY = """
+    SELECT employee, time, log_type
+    FROM `tabEmployee Checkin`
+    WHERE employee = %(employee)s
+    ORDER BY time DESC
+    LIMIT 1
+"""
+
+RECENT_CHECKINS_QUERY = """
+    SELECT name, employee, employee_name, log_type, time
+    FROM `tabEmployee Checkin`
+    WHERE employee = %(employee)s
+    ORDER BY time DESC
+    LIMIT %(limit)s
+"""
+
+OPEN_REGULARISE_QUERY = """
+    SELECT name, employee, employee_name, log_type, time,
+           custom_regularise_time, custom_regularise_approver
+    FROM `tabEmployee Checkin`
+    WHERE custom_regularise_approver = %(approver)s
+      AND custom_status = 'Open'
+    ORDER BY time DESC
+    LIMIT %(limit)s
+"""
+
+OUT_OF_FENCE_QUERY = """
+    SELECT c.name, c.employee, c.employee_name, c.log_type, c.time,
+           c.latitude, c.longitude, c.custom_status
+    FROM `tabEmployee Checkin` c
+    INNER JOIN `tabEmployee` e ON e.name = c.employee
+    WHERE c.custom_geofence_status = 'Outside'
+      AND IFNULL(c.custom_status, '') = ''
+      AND (
+        e.leave_approver = %(approver)s
+        OR e.reports_to IN (SELECT m.name FROM `tabEmployee` m WHERE m.user_id = %(approver)s)
+      )
+    ORDER BY c.time DESC
+    LIMIT %(limit)s
+"""
+
+CHECKIN_TIME_BOUNDS_QUERY = """
+    SELECT MIN(time), MAX(time) FROM `tabEmployee Checkin`
+"""
+
+DAILY_BOUNDS_QUERY = """
+    SELECT
+        employee,
+        MAX(employee_name) AS employee_name,
+        DATE(time) AS attendance_date,
+        MIN(CASE WHEN log_type = 'IN'  THEN time END) AS first_in,
+        MAX(CASE WHEN log_type = 'OUT' THEN time END) AS last_out,
+        COUNT(*) AS checkin_count
+    FROM `tabEmployee Checkin`
+    WHERE {conditions}
+    GROUP BY employee, DATE(time)
+"""
+
+
+@request_cache
+def get_archived_until() -> Optional[datetime.date]:
+    """Check-ins before this date have been moved to the archive (None if nothing is archived)."""
+    value = frappe.db.get_global(ARCHIVED_UNTIL_KEY)
+    return getdate(value) if value else None
+
+
+def on_archive(query: str) -> str:
+    """The same query against the archive table."""
+    return query.replace(CHECKIN_TABLE, ARCHIVE_TABLE)
+
+
+def get_last_checkin(employee: str) -> Dict:
+    """Latest punch of `employee` ({} if none)."""
+    rows = frappe.db.sql(LAST_CHECKIN_QUERY, {"employee": employee}, as_dict=True)
+    if not rows and get_archived_until():
+        rows = frappe.db.sql(on_archive(LAST_CHECKIN_QUERY), {"employee": employee}, as_dict=True)
+    return rows[0] if rows else {}
+
+
+def get_recent_checkins(employee: str, limit: int = 5) -> List[Dict]:
+    rows = frappe.db.sql(RECENT_CHECKINS_QUERY, {"employee": employee, "limit": int(limit)}, as_dict=True)
+    if len(rows) < int(limit) and get_archived_until():
+        rows += frappe.db.sql(
+            on_archive(RECENT_CHECKINS_QUERY), {"employee": employee, "limit": int(limit) - len(rows)}, as_dict=True
+        )
+    return rows
+
+
+def get_open_regularise_requests(approver: str, limit: int = 5) -> List[Dict]:
+    return frappe.db.sql(OPEN_REGULARISE_QUERY, {"approver": approver, "limit": int(limit)}, as_dict=True)
+
+
+def get_out_of_fence_checkins(approver: str, limit: int = 20) -> List[Dict]:
+    """Unreviewed punches made outside every geofence by employees `approver` approves for."""
+    return frappe.db.sql(OUT_OF_FENCE_QUERY, {"approver": approver, "limit": int(limit)}, as_dict=True)
+
+
+def get_checkin_time_bounds() -> Tuple[Optional[datetime.datetime], Optional[datetime.datetime]]:
+    """(earliest, latest) punch time in the hot table, or (None, None) if it is empty."""
+    return tuple(frappe.db.sql(CHECKIN_TIME_BOUNDS_QUERY)[0])
+
+
+def daily_bounds_query(employee: Optional[str] = None) -> str:
+    """DAILY_BOUNDS_QUERY with a half-open `time` range (and optional employee) predicate."""
+    conditions = "time >= %(start)s AND time < %(end)s"
+    if employee:
+        conditions = "employee = %(employee)s AND " + conditions
+    return DAILY_BOUNDS_QUERY.format(conditions=conditions)
+
+
+def get_daily_checkin_bounds(
+    start: datetime.date, end: datetime.date, employee: Optional[str] = None
+) -> List[Dict]:
+    """First IN / last OUT per (employee, day) for check-ins on days start..end inclusive."""
+    query = daily_bounds_query(employee)
+    values = {"start": start, "end": add_days(end, 1), "employee": employee}
+    rows = frappe.db.sql(query, values, as_dict=True)
+
+    archived_until = get_archived_until()
+    if not archived_until or getdate(start) >= archived_until:
+        return rows
+
+    # Late backfills can leave a few rows of an archived day in the hot table; merge per day.
+    merged = {(r["employee"], r["attendance_date"]): r for r in rows}
+    for r in frappe.db.sql(on_archive(query), values, as_dict=True):
+        cur = merged.get((r["employee"], r["attendance_date"]))
+        if not cur:
+            merged[(r["employee"], r["attendance_date"])] = r
+            continue
+        cur["first_in"] = min(filter(None, (cur["first_in"], r["first_in"])), default=None)
+        cur["last_out"] = max(filter(None, (cur["last_out"], r["last_out"])), default=None)
+        cur["checkin_count"] += r["checkin_count"]
+    return list(merged.values())
@@ -0,0 +1,119 @@
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import frappe
+from frappe.utils import get_last_day, getdate, today
+
+from fbts.api.birthday import get_today_birthdays
+from fbts.api.leave_balance import get_leave_balances
+from fbts.api.leave_request import get_emp_leave_list
+from fbts.api.monthly import get_employee_holiday_names
+from fbts.api.work_duration import get_last_attendance_records
+
+ATTENDANCE_DAYS = 10
+SECTIONS = ("attendance", "holidays", "birthdays", "leave_balance", "monthly", "leaves")
+PRIVILEGED_ROLES = {"HR Manager", "System Manager"}
+
+
+# -----------------------------
+# Helpers
+# -----------------------------
+def _resolve_employee(employee: Optional[str]) -> str:
+    """The caller's own Employee; HR can pass any `employee`."""
+    own = frappe.db.get_value("Employee", {"user_id": frappe.session.user, "status": "Active"}, "name")
+    if employee and employee != own:
+        if not PRIVILEGED_ROLES & set(frappe.get_roles()):
+            frappe.throw(f"Not permitted to view the dashboard of {employee}.", exc=frappe.PermissionError)
+        return employee
+    if not own:
+        frappe.throw("No active Employee is linked to the current user.", exc=frappe.DoesNotExistError)
+    return own
+
+
+def _upcoming_holidays(employee: str) -> List[Dict[str, Any]]:
+    """The employee's remaining holidays this year (weekly offs and Sundays excluded)."""
+    holiday_list = frappe.db.sql(
+        """
+        SELECT COALESCE(NULLIF(e.holiday_list, ''), c.default_holiday_list)
+        FROM `tabEmployee` e
+        LEFT JOIN `tabCompany` c ON c.name = e.company
+        WHERE e.name = %(employee)s
+        """,
+        {"employee": employee},
+    )
+    if not holiday_list or not holiday_list[0][0]:
+        return []
+
+    current = getdate(today())
+    holidays = frappe.db.get_all(
+        "Holiday",
+        fields=["holiday_date", "description"],
+        filters={
+            "parent": holiday_list[0][0],
+            "weekly_off": 0,
+            "holiday_date": ["between", [current, get_last_day(current.replace(month=12))]],
+        },
+        order_by="holiday_date asc",
+    )
+    return [h for h in holidays if (h.get("description") or "").strip().lower() != "sunday"]
+
+
+def _run_sections(sections: Dict[str, Callable[[], Any]]) -> Dict[str, Any]:
+    """Run each section, timing it; a failing section is reported without failing the rest."""
+    data, timings, errors = {}, {}, {}
+    for name, fn in sections.items():
+        started = time.perf_counter()
+        try:
+            data[name] = fn()
+        except Exception as e:
+            frappe.log_error(title=f"Dashboard section {name} failed")
+            data[name], errors[name] = None, str(e) or e.__class__.__name__
+        timings[name] = round((time.perf_counter() - started) * 1000, 2)
+    return {"sections": data, "timings_ms": timings, "errors": errors}
+
+
+# -----------------------------
+# Main API
+# -----------------------------
+@frappe.whitelist()
+def get_home_dashboard(employee: Optional[str] = None, month: Optional[str] = None, sections=None):
+    """
+    Everything the Home dashboard shows, for the logged-in employee, in one request.
+    `sections` (comma-separated or JSON list) limits the work to the sections the
+    caller renders; by default all of them are computed:
+
+    {
+        "employee": "FI-00001",
+        "sections": {
+            "attendance": [...],       # last 10 days, as work_duration.get_last_10_attendance_records
+            "holidays": [...],         # remaining holidays of the year
+            "birthdays": {"count", "employees"},
+            "leave_balance": {leave_type: balance},
+            "monthly": {...},          # as monthly.get_employee_holiday_names for `month`
+            "leaves": [...]            # as leave_request.get_emp_leave_list
+        },
+        "timings_ms": {section: ms, ..., "total": ms},
+        "errors": {section: message}
+    }
+    """
+    started = time.perf_counter()
+    employee = _resolve_employee(employee)
+
+    if isinstance(sections, str):
+        sections = frappe.parse_json(sections) if sections.strip().startswith("[") else sections.split(",")
+    wanted = [s.strip() for s in sections] if sections else list(SECTIONS)
+    unknown = set(wanted) - set(SECTIONS)
+    if unknown:
+        frappe.throw(f"Unknown dashboard sections: {', '.join(sorted(unknown))}", exc=frappe.ValidationError)
+
+    builders = {
+        "attendance": lambda: get_last_attendance_records(employee, ATTENDANCE_DAYS),
+        "holidays": lambda: _upcoming_holidays(employee),
+        "birthdays": get_today_birthdays,
+        "leave_balance": lambda: get_leave_balances([employee]).get(employee, {}),
+        "monthly": lambda: get_employee_holiday_names(employee=employee, month=month),
+        "leaves": lambda: get_emp_leave_list(employee),
+    }
+    result = _run_sections({name: builders[name] for name in SECTIONS if name in wanted})
+    result["timings_ms"]["total"] = round((time.perf_counter() - started) * 1000, 2)
+    return {"employee": employee, **result}
@@ -18,39 +18,70 @@
 
 import frappe
 
+from fbts.api.checkin_buffer import append_punch, is_write_behind_enabled
+from fbts.api.checkin_state import forget_state, toggle_state
+from fbts.api.geofence import locate
+from fbts.api.idempotency import run_idempotent
+from fbts.api.presence import record_punch
+
 @frappe.whitelist(allow_guest=True)
-def create_checkin(employee, latitude=22.5738752, longitude=88.3785728):
-    # Fetch last check-in for the employee
-    last_log_type = frappe.db.get_value(
-        "Employee Checkin",
-        filters={"employee": employee},
-        fieldname="log_type",
-        order_by="time desc"
+def create_checkin(employee, latitude=None, longitude=None, idempotency_key=None):
+    # Retries carrying the same idempotency key get the first result back
+    return run_idempotent(
+        "create_checkin", employee, idempotency_key, lambda: _create_checkin(employee, latitude, longitude)
     )
 
-    # Toggle log_type
-    if last_log_type == "IN":
-        new_log_type = "OUT"
-    else:
-        new_log_type = "IN"
+
+def _create_checkin(employee, latitude=None, longitude=None):
+    now = frappe.utils.now()
+
+    # Flip IN/OUT atomically in Redis (seeded from the last check-in on a miss)
+    _previous, new_log_type = toggle_state(employee, now)
+
+    # Write-behind mode: acknowledge once the punch is in the stream, the flusher inserts it
+    if is_write_behind_enabled():
+        try:
+            entry_id = append_punch(employee, now, new_log_type, "WebApp", latitude, longitude)
+        except Exception:
+            forget_state(employee)
+            raise
+        record_punch(employee, new_log_type, now)
+        # Same lookup the flusher's ingest applies when it inserts the row
+        geofence_status, _site = locate(latitude, longitude)
+        return {
+            "message": f"{new_log_type} check-in recorded",
+            "name": None,
+            "log_type": new_log_type,
+            "geofence_status": geofence_status,
+            "queued": 1,
+            "entry_id": entry_id,
+        }
 
     # Create new check-in
     doc = frappe.get_doc({
         "doctype": "Employee Checkin",
         "employee": employee,
         "log_type": new_log_type,
-        "time": frappe.utils.now(),
+        "time": now,
         "device_id": "WebApp",
         "latitude": latitude,
         "longitude": longitude
     })
-    doc.insert()
-    frappe.db.commit()
+    doc.flags.checkin_state_synced = True
+    try:
+        doc.insert()
+        frappe.db.commit()
+    except Exception:
+        # The flip is already visible; drop it so the next tap rebuilds from the DB
+        forget_state(employee)
+        raise
+    record_punch(employee, new_log_type, now)
 
     return {
         "message": f"{new_log_type} check-in created",
         "name": doc.name,
-        "log_type": new_log_type
+        "log_type": new_log_type,
+        "geofence_status": doc.get("custom_geofence_status")
     }
 
 
@@ -61,10 +92,19 @@ import frappe
 from frappe import _
 
 @frappe.whitelist(allow_guest=True)
-def create_leave_application(data):
+def create_leave_application(data, idempotency_key=None):
     # parse JSON string to dict
     data = frappe.parse_json(data)
 
+    return run_idempotent(
+        "create_leave_application",
+        data.get("employee"),
+        idempotency_key or data.get("idempotency_key"),
+        lambda: _create_leave_application(data),
+    )
+
+
+def _create_leave_application(data):
     doc = frappe.get_doc({
         "doctype": "Leave Application",
         "employee": data.get("employee"),
@@ -286,8 +326,19 @@ def group_chat():
 
 
 
+from fbts.api.leave_index import LEAVE_STATUSES, load_leave_index
+
 @frappe.whitelist(allow_guest=True)
-def leave_status(employee):
+def leave_status(employee, from_date=None, to_date=None):
+    if from_date and to_date:
+        leaves = load_leave_index((employee,), from_date, to_date, LEAVE_STATUSES).overlapping(
+            employee, from_date, to_date
+        )
+        counts = {}
+        for l in leaves:
+            counts[l["status"]] = counts.get(l["status"], 0) + 1
+        return [{"status": status, "count": count} for status, count in counts.items()]
+
     leave_counts = frappe.db.get_all(
         "Leave Application",
         filters={"employee": employee},
@@ -0,0 +1,19 @@
+import frappe
+
+# A cache family (e.g. "fbts:monthly") embeds its current generation in every
+# key it writes; bumping the generation orphans all of them at once and the
+# old keys age out through their TTL.
+
+
+def raw_key(prefix: str, key: str) -> str:
+    """Site-scoped Redis key for raw (non-pickled) counters of the `prefix` family."""
+    return frappe.cache().make_key(f"{prefix}:{key}")
+
+
+def get_generation(prefix: str) -> int:
+    value = frappe.cache().get(raw_key(prefix, "generation"))
+    return int(value) if value else 0
+
+
+def bump_generation(prefix: str) -> None:
+    frappe.cache().incr(raw_key(prefix, "generation"))
@@ -0,0 +1,109 @@
+import math
+from typing import Dict, List, Optional, Tuple
+
+import frappe
+from frappe.utils import flt
+
+GEOFENCE_DOCTYPE = "Office Geofence"
+INDEX_CACHE_KEY = "fbts:geofence_index"
+BUILT_FIELD = "__built__"
+
+# Grid cells are CELL_DEG degrees square (~1.1 km of latitude). Every fence is
+# registered in each cell its bounding box touches, so a punch only has to be
+# tested against the handful of fences listed under its own cell.
+CELL_DEG = 0.01
+MAX_RADIUS_M = 5000
+EARTH_RADIUS_M = 6371008.8
+METRES_PER_DEG_LAT = 111320.0
+
+STATUS_INSIDE = "Inside"
+STATUS_OUTSIDE = "Outside"
+STATUS_NO_LOCATION = "No Location"
+STATUS_NOT_CONFIGURED = "Not Configured"
+
+
+# -----------------------------
+# Helpers
+# -----------------------------
+def _cell(lat: float, lon: float) -> str:
+    return f"{math.floor(lat / CELL_DEG)}:{math.floor(lon / CELL_DEG)}"
+
+
+def _cells_for_fence(lat: float, lon: float, radius: float) -> List[str]:
+    """All grid cells overlapped by the fence's bounding box."""
+    dlat = radius / METRES_PER_DEG_LAT
+    dlon = radius / (METRES_PER_DEG_LAT * max(math.cos(math.radians(lat)), 1e-6))
+    lat_lo, lat_hi = math.floor((lat - dlat) / CELL_DEG), math.floor((lat + dlat) / CELL_DEG)
+    lon_lo, lon_hi = math.floor((lon - dlon) / CELL_DEG), math.floor((lon + dlon) / CELL_DEG)
+    return [f"{i}:{j}" for i in range(lat_lo, lat_hi + 1) for j in range(lon_lo, lon_hi + 1)]
+
+
+def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+def _build_index() -> None:
+    """Write {cell: [(site, lat, lon, radius), ...]} for every enabled fence into Redis."""
+    fences = frappe.db.get_all(
+        GEOFENCE_DOCTYPE,
+        filters={"enabled": 1},
+        fields=["name", "latitude", "longitude", "radius"],
+        limit=None,
+    )
+    index: Dict[str, List[Tuple[str, float, float, float]]] = {}
+    for f in fences:
+        lat, lon, radius = flt(f.latitude), flt(f.longitude), min(flt(f.radius), MAX_RADIUS_M)
+        for cell in _cells_for_fence(lat, lon, radius):
+            index.setdefault(cell, []).append((f.name, lat, lon, radius))
+
+    cache = frappe.cache()
+    for cell, entries in index.items():
+        cache.hset(INDEX_CACHE_KEY, cell, entries)
+    cache.hset(INDEX_CACHE_KEY, BUILT_FIELD, len(fences))
+
+
+def _fence_count() -> int:
+    built = frappe.cache().hget(INDEX_CACHE_KEY, BUILT_FIELD)
+    if built is None:
+        _build_index()
+        built = frappe.cache().hget(INDEX_CACHE_KEY, BUILT_FIELD)
+    return built or 0
+
+
+# -----------------------------
+# Public
+# -----------------------------
+def locate(latitude, longitude) -> Tuple[str, Optional[str]]:
+    """
+    Classify a coordinate against the office geofences; returns (status, site).
+
+    status is Inside (site = the nearest containing fence), Outside,
+    No Location (coordinate missing) or Not Configured (no enabled fences).
+    """
+    if latitude in (None, "") or longitude in (None, ""):
+        return STATUS_NO_LOCATION, None
+    if not _fence_count():
+        return STATUS_NOT_CONFIGURED, None
+
+    lat, lon = flt(latitude), flt(longitude)
+    best = None
+    for site, f_lat, f_lon, radius in frappe.cache().hget(INDEX_CACHE_KEY, _cell(lat, lon)) or []:
+        distance = haversine_m(lat, lon, f_lat, f_lon)
+        if distance <= radius and (best is None or distance < best[1]):
+            best = (site, distance)
+
+    return (STATUS_INSIDE, best[0]) if best else (STATUS_OUTSIDE, None)
+
+
+def invalidate_index(doc=None, method=None):
+    """doc_events hook for Office Geofence: rebuild the grid on next lookup."""
+    frappe.cache().delete_value(INDEX_CACHE_KEY)
+
+
+def set_checkin_geofence(doc, method=None):
+    """doc_events hook (Employee Checkin validate): flag punches made outside every geofence."""
+    if doc.is_new() or doc.has_value_changed("latitude") or doc.has_value_changed("longitude"):
+        doc.custom_geofence_status, doc.custom_geofence_site = locate(doc.latitude, doc.longitude)
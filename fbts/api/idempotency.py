@@ -0,0 +1,79 @@
+import json
+import time
+from typing import Any, Callable, Optional
+
+import frappe
+from frappe import _
+
+IDEMPOTENCY_PREFIX = "fbts:idempotency"
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+RESULT_TTL = 24 * 60 * 60
+PENDING_TTL = 60  # a crashed request frees its key after this long
+PENDING = "__pending__"
+WAIT_SECONDS = 5
+MAX_KEY_LENGTH = 128
+
+
+# -----------------------------
+# Helpers
+# -----------------------------
+def _request_key(idempotency_key: Optional[str]) -> Optional[str]:
+    key = idempotency_key or frappe.get_request_header(IDEMPOTENCY_HEADER)
+    key = (key or "").strip()
+    if len(key) > MAX_KEY_LENGTH:
+        frappe.throw(_("Idempotency key is too long"), exc=frappe.ValidationError)
+    return key or None
+
+
+def _redis_key(scope: str, owner: str, key: str) -> str:
+    return frappe.cache().make_key(f"{IDEMPOTENCY_PREFIX}:{scope}:{owner}:{key}")
+
+
+def _wait_for_result(name: str) -> Optional[Any]:
+    """Poll while the first request with this key is still running."""
+    deadline = time.monotonic() + WAIT_SECONDS
+    while time.monotonic() < deadline:
+        value = frappe.cache().get(name)
+        if value is None:
+            return None
+        if value.decode() != PENDING:
+            return json.loads(value)
+        time.sleep(0.1)
+    frappe.throw(_("A request with this idempotency key is still in progress"), exc=frappe.DuplicateEntryError)
+
+
+# -----------------------------
+# Public
+# -----------------------------
+def run_idempotent(scope: str, owner: str, idempotency_key: Optional[str], fn: Callable[[], Any]) -> Any:
+    """
+    Run `fn` at most once per (scope, owner, key) within RESULT_TTL.
+
+    The key comes from `idempotency_key` or the Idempotency-Key header; without
+    one, `fn` simply runs. A retry with a completed key gets the stored result
+    back without touching the DB. With a key, the work is committed before the
+    result is stored; if `fn` raises, the key is released so the client can retry.
+    """
+    key = _request_key(idempotency_key)
+    if not key:
+        return fn()
+
+    name = _redis_key(scope, owner or frappe.session.user, key)
+    if not frappe.cache().set(name, PENDING, ex=PENDING_TTL, nx=True):
+        result = _wait_for_result(name)
+        if result is not None:
+            return result
+        # The first attempt failed and released the key; take it over.
+        if not frappe.cache().set(name, PENDING, ex=PENDING_TTL, nx=True):
+            return _wait_for_result(name)
+
+    try:
+        result = fn()
+        # The stored result must never point at rows that could still roll back
+        frappe.db.commit()
+    except Exception:
+        frappe.cache().delete(name)
+        raise
+
+    frappe.cache().set(name, json.dumps(result, default=str), ex=RESULT_TTL)
+    return result
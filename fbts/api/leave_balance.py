@@ -1,9 +1,179 @@
+from collections import defaultdict
+from typing import Dict, Iterable, Optional
+
 import frappe
+from frappe.utils import getdate, today
+
+from fbts.api.team_access import resolve_approver, restrict_to_team, team_of
+
+SNAPSHOT_DOCTYPE = "Leave Balance Snapshot"
+
+# Every Leave Allocation opens a period [from_date, max(to_date)] (the
+# carry-forward entry can end earlier than the fresh one). The period's
+# balance is the allocation's own ledger entries (allocation, carry forward,
+# expiry) plus every application / encashment entry dated inside it.
+ALLOCATION_PERIOD_QUERY = """
+    SELECT employee, leave_type, MIN(from_date) AS period_start, MAX(to_date) AS period_end,
+           SUM(CASE WHEN leaves > 0 AND is_expired = 0 THEN leaves ELSE 0 END) AS allocated
+    FROM `tabLeave Ledger Entry`
+    WHERE transaction_type = 'Leave Allocation' AND transaction_name = %(allocation)s AND docstatus = 1
+    GROUP BY employee, leave_type
+"""
+
+PERIOD_BALANCE_QUERY = """
+    SELECT IFNULL(SUM(leaves), 0)
+    FROM `tabLeave Ledger Entry`
+    WHERE docstatus = 1
+      AND employee = %(employee)s
+      AND leave_type = %(leave_type)s
+      AND (
+        transaction_name = %(allocation)s
+        OR (transaction_type != 'Leave Allocation' AND from_date BETWEEN %(period_start)s AND %(period_end)s)
+      )
+"""
+
+# Snapshots hold the whole period; entries dated after D are taken back out.
+BALANCE_AS_OF_QUERY = """
+    SELECT s.employee, s.leave_type, SUM(s.balance) AS balance, SUM(s.allocated) AS allocated
+    FROM `tabLeave Balance Snapshot` s
+    WHERE s.employee IN %(employees)s AND s.period_start <= %(date)s AND s.period_end >= %(date)s
+    GROUP BY s.employee, s.leave_type
+"""
+
+FUTURE_ENTRIES_QUERY = """
+    SELECT s.employee, s.leave_type, SUM(l.leaves) AS leaves
+    FROM `tabLeave Balance Snapshot` s
+    INNER JOIN `tabLeave Ledger Entry` l
+        ON l.employee = s.employee
+        AND l.leave_type = s.leave_type
+        AND l.docstatus = 1
+        AND l.from_date > %(date)s
+        AND l.from_date <= s.period_end
+        AND (l.transaction_name = s.leave_allocation OR l.transaction_type != 'Leave Allocation')
+    WHERE s.employee IN %(employees)s AND s.period_start <= %(date)s AND s.period_end >= %(date)s
+    GROUP BY s.employee, s.leave_type
+"""
+
+
+# -----------------------------
+# Maintenance
+# -----------------------------
+def refresh_allocation_snapshot(allocation: str) -> None:
+    """Recompute the running balance of one allocation period (dropped if the allocation is gone)."""
+    period = frappe.db.sql(ALLOCATION_PERIOD_QUERY, {"allocation": allocation}, as_dict=True)
+    if not period:
+        frappe.db.delete(SNAPSHOT_DOCTYPE, {"leave_allocation": allocation})
+        return
+
+    p = period[0]
+    balance = frappe.db.sql(PERIOD_BALANCE_QUERY, {**p, "allocation": allocation})[0][0]
+    now, user = frappe.utils.now(), frappe.session.user
+    frappe.db.sql(
+        f"""
+        INSERT INTO `tab{SNAPSHOT_DOCTYPE}`
+            (name, employee, employee_name, leave_type, leave_allocation, period_start, period_end,
+             allocated, balance, creation, modified, owner, modified_by)
+        VALUES (%(name)s, %(employee)s, %(employee_name)s, %(leave_type)s, %(name)s, %(period_start)s,
+                %(period_end)s, %(allocated)s, %(balance)s, %(now)s, %(now)s, %(user)s, %(user)s)
+        ON DUPLICATE KEY UPDATE
+            period_start = VALUES(period_start),
+            period_end = VALUES(period_end),
+            allocated = VALUES(allocated),
+            balance = VALUES(balance),
+            modified = VALUES(modified),
+            modified_by = VALUES(modified_by)
+        """,
+        {
+            **p,
+            "name": allocation,
+            "employee_name": frappe.db.get_value("Employee", p.employee, "employee_name"),
+            "balance": balance,
+            "now": now,
+            "user": user,
+        },
+    )
+
+
+def refresh_snapshots_for_dates(employee: str, leave_type: str, from_date, to_date=None) -> None:
+    """Refresh every snapshot of (employee, leave_type) whose period overlaps [from_date, to_date]."""
+    if not (employee and leave_type and from_date):
+        return
+    allocations = frappe.db.sql_list(
+        """
+        SELECT DISTINCT transaction_name
+        FROM `tabLeave Ledger Entry`
+        WHERE employee = %(employee)s AND leave_type = %(leave_type)s AND docstatus = 1
+          AND transaction_type = 'Leave Allocation'
+          AND from_date <= %(to_date)s AND to_date >= %(from_date)s
+        """,
+        {"employee": employee, "leave_type": leave_type, "from_date": from_date, "to_date": to_date or from_date},
+    )
+    for allocation in allocations:
+        refresh_allocation_snapshot(allocation)
+
+
+def rebuild_leave_balance_snapshots() -> None:
+    """Backfill: one snapshot per allocation that has ledger entries."""
+    for allocation in frappe.db.sql_list(
+        """
+        SELECT DISTINCT transaction_name FROM `tabLeave Ledger Entry`
+        WHERE transaction_type = 'Leave Allocation' AND docstatus = 1
+        """
+    ):
+        refresh_allocation_snapshot(allocation)
 
+
+# -----------------------------
+# doc_events
+# -----------------------------
+def on_ledger_entry_change(doc, method=None):
+    """Leave Ledger Entry on_submit / on_cancel."""
+    if doc.transaction_type == "Leave Allocation":
+        refresh_allocation_snapshot(doc.transaction_name)
+    else:
+        refresh_snapshots_for_dates(doc.employee, doc.leave_type, doc.from_date, doc.to_date)
+
+
+def on_leave_source_cancel(doc, method=None):
+    """
+    Leave Application / Allocation / Encashment on_cancel. HRMS deletes the
+    ledger entries of a cancelled document with plain SQL, so the ledger's own
+    doc_events never fire for it.
+    """
+    if doc.doctype == "Leave Allocation":
+        refresh_allocation_snapshot(doc.name)
+    elif doc.doctype == "Leave Encashment":
+        refresh_snapshots_for_dates(doc.employee, doc.leave_type, doc.encashment_date)
+    else:
+        refresh_snapshots_for_dates(doc.employee, doc.leave_type, doc.from_date, doc.to_date)
+
+
+# -----------------------------
+# Readers
+# -----------------------------
+def get_leave_balances(employees: Iterable[str], as_of=None) -> Dict[str, Dict[str, float]]:
+    """{employee: {leave_type: balance}} as of `as_of` (default today), for any number of employees."""
+    employees = tuple(employees)
+    if not employees:
+        return {}
+    values = {"employees": employees, "date": getdate(as_of or today())}
+
+    balances: Dict[str, Dict[str, float]] = defaultdict(dict)
+    for r in frappe.db.sql(BALANCE_AS_OF_QUERY, values, as_dict=True):
+        balances[r.employee][r.leave_type] = float(r.balance or 0)
+    for r in frappe.db.sql(FUTURE_ENTRIES_QUERY, values, as_dict=True):
+        if r.leave_type in balances.get(r.employee, {}):
+            balances[r.employee][r.leave_type] -= float(r.leaves or 0)
+    return {emp: {lt: round(v, 3) for lt, v in types.items()} for emp, types in balances.items()}
+
+
+# -----------------------------
+# Main API
+# -----------------------------
 @frappe.whitelist(allow_guest=True)
-def get_employee_leave_balance(employee):
+def get_employee_leave_balance(employee, date=None):
     """
-    Returns the net leave balance of all leave types for a given employee.
+    Returns the leave balance per leave type for a given employee as of `date` (default today).
 
     Example Output:
     {
@@ -14,22 +184,20 @@ def get_employee_leave_balance(employee):
     if not employee:
         frappe.throw("Employee ID is required")
 
-    # Fetch all leave ledger entries for the employee
-    entries = frappe.db.get_all(
-        'Leave Ledger Entry',
-        filters={'employee': employee},
-        fields=['leave_type', 'leaves']
-    )
-
-    leave_balance = {}
+    return get_leave_balances([employee], date).get(employee, {})
 
-    for entry in entries:
-        leave_type = entry['leave_type']
-        leaves = entry['leaves']
 
-        if leave_type not in leave_balance:
-            leave_balance[leave_type] = 0.0
-
-        leave_balance[leave_type] += leaves
-
-    return leave_balance
+@frappe.whitelist()
+def get_team_leave_balances(employees=None, approver: Optional[str] = None, date=None):
+    """
+    Balances for a whole team in one call: `employees` (list or JSON list), or
+    everyone whose leave approver / reporting manager is `approver` (default: the caller).
+    Outside HR Manager / System Manager, only the caller's own team can be read.
+    Returns {employee: {leave_type: balance}}.
+    """
+    if employees:
+        employees = frappe.parse_json(employees) if isinstance(employees, str) else employees
+        employees = restrict_to_team(employees)
+    else:
+        employees = team_of(resolve_approver(approver))
+    return get_leave_balances(employees, date)
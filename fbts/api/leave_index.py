@@ -0,0 +1,130 @@
+import datetime
+from bisect import bisect_right
+from collections import defaultdict
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import frappe
+from frappe.utils import add_days, getdate
+from frappe.utils.caching import request_cache
+
+LEAVE_STATUSES = ("Open", "Approved", "Rejected", "Cancelled")
+
+LEAVE_FIELDS = [
+    "name",
+    "employee",
+    "from_date",
+    "to_date",
+    "leave_type",
+    "description",
+    "half_day",
+    "half_day_date",
+    "total_leave_days",
+    "leave_approver",
+    "status",
+    "posting_date",
+]
+
+
+class LeaveIntervalIndex:
+    """
+    Leave Applications kept as sorted [from_date, to_date] intervals per employee.
+
+    Lookups bisect on the start dates and use a running max of end dates to
+    stop early, so "on leave at d" and "overlapping [a, b]" are O(log n + k)
+    instead of expanding every leave into one entry per day.
+    """
+
+    def __init__(self, rows: Iterable[Dict[str, Any]]):
+        by_employee: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for row in rows:
+            row["from_date"] = getdate(row["from_date"])
+            row["to_date"] = getdate(row["to_date"])
+            by_employee[row["employee"]].append(row)
+
+        self._rows: Dict[str, List[Dict[str, Any]]] = {}
+        self._starts: Dict[str, List[datetime.date]] = {}
+        self._max_ends: Dict[str, List[datetime.date]] = {}
+        for employee, leaves in by_employee.items():
+            leaves.sort(key=lambda r: (r["from_date"], r["to_date"]))
+            max_ends, running = [], None
+            for r in leaves:
+                running = r["to_date"] if running is None else max(running, r["to_date"])
+                max_ends.append(running)
+            self._rows[employee] = leaves
+            self._starts[employee] = [r["from_date"] for r in leaves]
+            self._max_ends[employee] = max_ends
+
+    def _scan_back(self, employee: str, start: datetime.date, end: datetime.date) -> Iterator[Dict[str, Any]]:
+        """Intervals of `employee` intersecting [start, end], latest start first."""
+        starts = self._starts.get(employee)
+        if not starts:
+            return
+        rows, max_ends = self._rows[employee], self._max_ends[employee]
+        i = bisect_right(starts, end) - 1
+        while i >= 0 and max_ends[i] >= start:
+            if rows[i]["to_date"] >= start:
+                yield rows[i]
+            i -= 1
+
+    def leave_on(self, employee: str, d) -> Optional[Dict[str, Any]]:
+        """The leave covering date `d` (earliest-starting one if several), else None."""
+        d = getdate(d)
+        found = None
+        for row in self._scan_back(employee, d, d):
+            found = row
+        return found
+
+    def overlapping(self, employee: str, start, end) -> List[Dict[str, Any]]:
+        """Leaves of `employee` intersecting [start, end], ordered by from_date."""
+        return list(reversed(list(self._scan_back(employee, getdate(start), getdate(end)))))
+
+    def dates_in(self, employee: str, start, end) -> Iterator[datetime.date]:
+        """Each date in [start, end] covered by at least one leave (for calendar rendering)."""
+        start, end = getdate(start), getdate(end)
+        last_yielded = None
+        for row in self.overlapping(employee, start, end):
+            cur = max(row["from_date"], start)
+            if last_yielded and cur <= last_yielded:
+                cur = add_days(last_yielded, 1)
+            stop = min(row["to_date"], end)
+            while cur <= stop:
+                yield cur
+                last_yielded = cur
+                cur = add_days(cur, 1)
+
+    def merged_intervals(self, employee: str, start, end) -> List[Tuple[datetime.date, datetime.date]]:
+        """Union of the leave intervals of `employee` clipped to [start, end]."""
+        start, end = getdate(start), getdate(end)
+        merged: List[List[datetime.date]] = []
+        for row in self.overlapping(employee, start, end):
+            a, b = max(row["from_date"], start), min(row["to_date"], end)
+            if merged and a <= add_days(merged[-1][1], 1):
+                merged[-1][1] = max(merged[-1][1], b)
+            else:
+                merged.append([a, b])
+        return [(a, b) for a, b in merged]
+
+
+@request_cache
+def load_leave_index(
+    employees: Optional[Tuple[str, ...]],
+    from_date,
+    to_date,
+    statuses: Sequence[str] = ("Approved",),
+) -> LeaveIntervalIndex:
+    """
+    Build (once per request) the index of Leave Applications overlapping
+    [from_date, to_date] for `employees` (None = everyone) in `statuses`.
+    """
+    filters: Dict[str, Any] = {
+        "status": ["in", list(statuses)],
+        "from_date": ["<=", getdate(to_date)],
+        "to_date": [">=", getdate(from_date)],
+    }
+    if employees is not None:
+        if not employees:
+            return LeaveIntervalIndex([])
+        filters["employee"] = ["in", list(employees)]
+
+    rows = frappe.db.get_all("Leave Application", filters=filters, fields=LEAVE_FIELDS, limit=None)
+    return LeaveIntervalIndex(rows)
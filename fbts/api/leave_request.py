@@ -24,6 +24,84 @@ def get_leave_applications(leave_approver: str):
     )
 
 
+import frappe
+
+from fbts.api.leave_index import LEAVE_STATUSES
+
+INBOX_DEFAULT_PAGE_SIZE = 20
+INBOX_MAX_PAGE_SIZE = 100
+
+# Page rows and per-status counts in one round trip. The counts and a
+# single-status page are served by leave_approver_inbox_index
+# (leave_approver, status, posting_date, name); a page over several statuses
+# walks leave_approver_posting_index (leave_approver, posting_date, name) in
+# order instead of sorting. UNION ALL keeps no order, so rows are re-sorted
+# in Python.
+LEAVE_INBOX_QUERY = """
+    (
+        SELECT 'row' AS kind, name, employee, employee_name, from_date, to_date, leave_type,
+               description, total_leave_days, leave_approver, status, posting_date, NULL AS total
+        FROM `tabLeave Application`
+        WHERE leave_approver = %(approver)s
+          AND status IN %(statuses)s
+          {keyset}
+        ORDER BY posting_date DESC, name DESC
+        LIMIT %(limit)s
+    )
+    UNION ALL
+    (
+        SELECT 'count', NULL, NULL, NULL, NULL, NULL, NULL,
+               NULL, NULL, NULL, status, NULL, COUNT(*)
+        FROM `tabLeave Application`
+        WHERE leave_approver = %(approver)s
+        GROUP BY status
+    )
+"""
+
+
+@frappe.whitelist(allow_guest=True)
+def get_leave_inbox(leave_approver: str, status: str = "Open", cursor: str = None, page_size: int = INBOX_DEFAULT_PAGE_SIZE):
+    """
+    One page of an approver's Leave Applications, newest first, plus counts per status.
+
+    `status` is one status, a comma-separated list or "All". Pass the returned
+    `next_cursor` back as `cursor` for the next page (keyset on posting_date, name).
+    Returns {"applications", "next_cursor", "counts": {status: n, "All": n}}.
+    """
+    if not leave_approver:
+        frappe.throw("Parameter 'leave_approver' is required.", exc=frappe.ValidationError)
+
+    statuses = LEAVE_STATUSES if (status or "All") == "All" else tuple(s.strip() for s in status.split(","))
+    page_size = max(1, min(int(page_size or INBOX_DEFAULT_PAGE_SIZE), INBOX_MAX_PAGE_SIZE))
+    values = {"approver": leave_approver, "statuses": statuses, "limit": page_size + 1}
+
+    keyset = ""
+    if cursor:
+        posting_date, _sep, name = cursor.partition("|")
+        if not name:
+            frappe.throw("Invalid cursor.", exc=frappe.ValidationError)
+        keyset = "AND (posting_date < %(cursor_date)s OR (posting_date = %(cursor_date)s AND name < %(cursor_name)s))"
+        values.update(cursor_date=posting_date, cursor_name=name)
+
+    applications, counts = [], {s: 0 for s in LEAVE_STATUSES}
+    for r in frappe.db.sql(LEAVE_INBOX_QUERY.format(keyset=keyset), values, as_dict=True):
+        if r.pop("kind") == "count":
+            counts[r.status] = int(r.total)
+        else:
+            r.pop("total")
+            applications.append(r)
+    counts["All"] = sum(counts.values())
+
+    applications.sort(key=lambda r: (r.posting_date, r.name), reverse=True)
+    next_cursor = None
+    if len(applications) > page_size:
+        applications = applications[:page_size]
+        last = applications[-1]
+        next_cursor = f"{last.posting_date}|{last.name}"
+
+    return {"applications": applications, "next_cursor": next_cursor, "counts": counts}
+
+
 
 import frappe
 
@@ -40,15 +118,94 @@ def update_leave_status(name: str, status: str):
     return {"message": f"Leave Application {name} updated to status {status}"}
 
 
+BULK_DECISION_STATUSES = ("Approved", "Rejected")
+MAX_BULK_DECISIONS = 200
+
+
+def notify_leave_decisions(names):
+    """Background job: tell employees about decisions applied by bulk_update_leave_status."""
+    for name in names:
+        doc = frappe.get_doc("Leave Application", name)
+        if hasattr(doc, "notify_employee"):
+            doc.notify_employee()
+
+
+@frappe.whitelist()
+def bulk_update_leave_status(decisions, status: str = None):
+    """
+    Apply many leave decisions in one transaction.
+
+    `decisions` is a list (or JSON list) of {"name", "status"}, or of plain
+    Leave Application names when a common `status` is given. Each item is saved
+    under its own savepoint, so one failing item does not undo the others; the
+    whole batch is committed once and employee notifications are enqueued after
+    the commit. Items the caller cannot write to, and is not the leave
+    approver of, are reported as errors. Returns one {"name", "status", "ok",
+    "error"} per item.
+    """
+    decisions = frappe.parse_json(decisions) if isinstance(decisions, str) else decisions
+    if not decisions:
+        frappe.throw("Parameter 'decisions' is required.", exc=frappe.ValidationError)
+    if len(decisions) > MAX_BULK_DECISIONS:
+        frappe.throw(f"At most {MAX_BULK_DECISIONS} decisions per call.", exc=frappe.ValidationError)
+
+    results, applied = [], []
+    for i, item in enumerate(decisions):
+        name, item_status = (item, status) if isinstance(item, str) else (item.get("name"), item.get("status") or status)
+        result = {"name": name, "status": item_status, "ok": False, "error": None}
+        results.append(result)
+        if not name or item_status not in BULK_DECISION_STATUSES:
+            result["error"] = f"'name' and a status in {', '.join(BULK_DECISION_STATUSES)} are required."
+            continue
+
+        savepoint = f"leave_bulk_{i}"
+        frappe.db.savepoint(savepoint)
+        try:
+            leave_app = frappe.get_doc("Leave Application", name)
+            if not (
+                frappe.has_permission("Leave Application", "write", doc=leave_app)
+                or leave_app.leave_approver == frappe.session.user
+            ):
+                raise frappe.PermissionError(f"Not permitted to decide {name}.")
+            leave_app.status = item_status
+            leave_app.save()
+        except Exception as e:
+            frappe.db.rollback(save_point=savepoint)
+            frappe.clear_messages()
+            result["error"] = str(e) or e.__class__.__name__
+            continue
+        frappe.db.release_savepoint(savepoint)
+        result["ok"] = True
+        applied.append(name)
+
+    frappe.db.commit()
+    if applied:
+        frappe.enqueue(
+            "fbts.api.leave_request.notify_leave_decisions",
+            queue="short",
+            names=applied,
+        )
+
+    return {"updated": len(applied), "failed": len(results) - len(applied), "results": results}
+
+
 
 
 import frappe
 
+from fbts.api.leave_index import LEAVE_STATUSES, load_leave_index
+
 @frappe.whitelist(allow_guest=True)
-def get_emp_leave_list(employee: str):
+def get_emp_leave_list(employee: str, from_date: str = None, to_date: str = None):
     if not employee:
         frappe.throw("Parameter 'employee' is required.", exc=frappe.ValidationError)
 
+    if from_date and to_date:
+        leaves = load_leave_index((employee,), from_date, to_date, LEAVE_STATUSES).overlapping(
+            employee, from_date, to_date
+        )
+        return sorted(leaves, key=lambda l: l["posting_date"], reverse=True)
+
     return frappe.db.get_all(
         "Leave Application",
         fields=[
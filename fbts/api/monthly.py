@@ -1,11 +1,32 @@
 import calendar
 import datetime
+import json
+import tempfile
 from collections import defaultdict
-from typing import Optional, Tuple, Dict, Any
+from typing import Optional, Tuple, Dict, Any, Iterator, List
 
 import frappe
-from frappe.utils import add_days, getdate
-
+from frappe.utils import add_days, add_months, getdate
+from werkzeug.wrappers import Response
+from werkzeug.wsgi import wrap_file
+
+from fbts.api.attendance_cache import get_cached_month, set_cached_month
+from fbts.api.attendance_snapshot import (
+    get_months_to_freeze,
+    get_snapshots,
+    is_month_locked,
+    mark_month_frozen,
+    save_snapshots,
+)
+from fbts.api.attendance_summary import get_daily_summary_map
+from fbts.api.leave_index import load_leave_index
+from fbts.api.shift_resolver import get_shift_resolver
+
+DEFAULT_PAGE_SIZE = 200
+MAX_PAGE_SIZE = 1000
+SPOOL_MAX_BYTES = 4 * 1024 * 1024
+FREEZE_MONTHS_PER_RUN = 3
+ORG_WIDE_ROLES = ("HR Manager", "System Manager")
 
 # -----------------------------
 # Helpers
@@ -60,65 +81,35 @@ def _format_time(dt: Optional[datetime.datetime]) -> str:
     return dt.strftime("%H:%M:%S") if dt else ""
 
 
+def _leave_info(leave: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Leave fields shown on a day record."""
+    if not leave:
+        return {}
+    return {
+        "leave_type": leave.get("leave_type") or "",
+        "leave_description": (leave.get("description") or "").strip(),
+        "half_day": 1 if leave.get("half_day") else 0,
+    }
+
+
 # -----------------------------
-# Main API
+# Core
 # -----------------------------
-@frappe.whitelist(allow_guest=True)
-def get_employee_holiday_names(
-    employee: Optional[str] = None,
-    month: Optional[str] = None,
+def _build_employee_months(
+    employees: List[Dict[str, Any]],
+    month_start: datetime.date,
+    month_end: datetime.date,
     grace_minutes: int = 0,
-):
-    """
-    Returns per-employee day records with:
-      - holiday_name: "WO" (if weekly_off=1) else holiday description (or "")
-      - check_in, check_out, total_hours
-      - leave_type, leave_description, half_day (0/1)
-      - is_late (0/1), late_by_minutes (int)
-
-    Also adds:
-      - weekly_working_hours: {"YYYY-Www": float_hours}
-      - total_working_hours: float_hours
-    """
-    month_start, month_end = _parse_month_to_range(month)
-
-    # 1) Employees
-    emp_filters: Dict[str, Any] = {"status": "Active"}
-    if employee:
-        emp_filters["name"] = employee
-
-    employees = frappe.db.get_all(
-        "Employee",
-        filters=emp_filters,
-        fields=["name", "employee_name", "holiday_list"],
-        limit=None,
-    )
+) -> Dict[str, Dict[str, Any]]:
+    """Build the per-employee month payload for one batch of Employee rows."""
     if not employees:
-        return {} if not employee else {}
+        return {}
     emp_ids = [e["name"] for e in employees]
 
-    # 2) Active Shift Assignments (employee -> shift_type)
-    shift_assignments = frappe.db.get_all(
-        "Shift Assignment",
-        filters={"status": "Active", "employee": ["in", emp_ids]},
-        fields=["employee", "shift_type"],
-        limit=None,
-    )
-    emp_to_shift: Dict[str, str] = {}
-    for row in shift_assignments:
-        emp_to_shift[row["employee"]] = row["shift_type"]
-
-    # 3) Shift Type timings (name -> (start_time, end_time)) as timedelta from midnight
-    shift_types = frappe.db.get_all(
-        "Shift Type",
-        fields=["name", "start_time", "end_time"],
-        limit=None,
-    )
-    shift_time_map: Dict[str, Tuple[Optional[datetime.timedelta], Optional[datetime.timedelta]]] = {}
-    for st in shift_types:
-        shift_time_map[st["name"]] = (st.get("start_time"), st.get("end_time"))
+    # 1) Date-effective shift roster for the month
+    shifts = get_shift_resolver(month_start, month_end)
 
-    # 4) Holidays limited to month
+    # 2) Holidays limited to month
     holiday_map: Dict[str, Dict[datetime.date, Dict[str, Any]]] = defaultdict(dict)
     holiday_lists = list({e.get("holiday_list") for e in employees if e.get("holiday_list")})
     if holiday_lists:
@@ -138,68 +129,13 @@ def get_employee_holiday_names(
                 "weekly_off": 1 if h.get("weekly_off") else 0,
             }
 
-    # 5) Check-ins for the month only (first IN, last OUT)
-    checkin_map: Dict[str, Dict[datetime.date, Dict[str, Any]]] = defaultdict(dict)
-    if emp_ids:
-        checkin_rows = frappe.db.sql(
-            """
-            SELECT
-                employee,
-                DATE(time) AS work_date,
-                MIN(CASE WHEN log_type = 'IN'  THEN time END)  AS first_in,
-                MAX(CASE WHEN log_type = 'OUT' THEN time END)  AS last_out
-            FROM `tabEmployee Checkin`
-            WHERE employee IN %(emp_ids)s
-              AND DATE(time) BETWEEN %(start)s AND %(end)s
-            GROUP BY employee, DATE(time)
-            """,
-            {"emp_ids": tuple(emp_ids), "start": month_start, "end": month_end},
-            as_dict=True,
-        )
-        for r in checkin_rows:
-            d = getdate(r["work_date"])
-            cin = r.get("first_in")
-            cout = r.get("last_out")
-            hours = None
-            if cin and cout and cout > cin:
-                delta = (cout - cin).total_seconds()
-                hours = round(delta / 3600.0, 2)
-            checkin_map[r["employee"]][d] = {
-                "check_in": cin,
-                "check_out": cout,
-                "total_hours": hours,
-            }
+    # 3) Check-ins for the month only (first IN, last OUT), pre-aggregated per day
+    checkin_map = get_daily_summary_map(emp_ids, month_start, month_end)
 
-    # 6) Leaves overlapping the month
-    leave_rows = frappe.db.get_all(
-        "Leave Application",
-        filters={
-            "status": "Approved",
-            "employee": ["in", emp_ids],
-            "from_date": ["<=", month_end],
-            "to_date": [">=", month_start],
-        },
-        fields=["employee", "from_date", "to_date", "leave_type", "description", "half_day"],
-        limit=None,
-    )
-    leave_map: Dict[str, Dict[datetime.date, Dict[str, Any]]] = defaultdict(dict)
-    for l in leave_rows:
-        start = max(getdate(l["from_date"]), month_start)
-        end = min(getdate(l["to_date"]), month_end)
-        emp_id = l["employee"]
-        cur = start
-        while cur <= end:
-            leave_map[emp_id].setdefault(
-                cur,
-                {
-                    "leave_type": l.get("leave_type") or "",
-                    "leave_description": (l.get("description") or "").strip(),
-                    "half_day": 1 if l.get("half_day") else 0,
-                },
-            )
-            cur = add_days(cur, 1)
-
-    # 7) Build result (with late detection & pretty formatting)
+    # 4) Approved leaves overlapping the month, as per-employee intervals
+    leave_index = load_leave_index(tuple(emp_ids), month_start, month_end)
+
+    # 5) Build result (with late detection & pretty formatting)
     result = {}
     grace_td = datetime.timedelta(minutes=int(grace_minutes or 0))
 
@@ -210,13 +146,9 @@ def get_employee_holiday_names(
 
         holiday_dates = set(holiday_map[hlist].keys()) if hlist and hlist in holiday_map else set()
         checkin_dates = set(checkin_map.get(emp_id, {}).keys())
-        leave_dates = set(leave_map.get(emp_id, {}).keys())
+        leave_dates = set(leave_index.dates_in(emp_id, month_start, month_end))
         all_dates = sorted(holiday_dates | checkin_dates | leave_dates)
 
-        # resolve shift start_time for this employee
-        shift_name = emp_to_shift.get(emp_id)
-        shift_start_td = shift_time_map.get(shift_name, (None, None))[0] if shift_name else None
-
         records = []
         weekly_hours = defaultdict(float)
         total_hours_all = 0.0
@@ -241,9 +173,10 @@ def get_employee_holiday_names(
                 total_hours_all += float(hours)
 
             # leave info
-            leave_info = leave_map.get(emp_id, {}).get(d, {})
+            leave_info = _leave_info(leave_index.leave_on(emp_id, d)) if d in leave_dates else {}
 
-            # late detection
+            # late detection against the shift in effect that day
+            shift_start_td = shifts.shift_start(emp_id, d)
             is_late = 0
             late_by_minutes = 0
             if cin and shift_start_td is not None:
@@ -275,6 +208,180 @@ def get_employee_holiday_names(
             "days": records,
         }
 
-    if employee and employee in result:
-        return result[employee]
     return result
+
+
+def _build_or_thaw(
+    employees: List[Dict[str, Any]],
+    month_start: datetime.date,
+    month_end: datetime.date,
+    grace_minutes: int = 0,
+) -> Dict[str, Dict[str, Any]]:
+    """Serve locked months from their frozen snapshots; compute only what is missing."""
+    if int(grace_minutes or 0) or not employees or not is_month_locked(month_start):
+        return _build_employee_months(employees, month_start, month_end, grace_minutes)
+
+    frozen = get_snapshots([e["name"] for e in employees], month_start)
+    missing = [e for e in employees if e["name"] not in frozen]
+    live = _build_employee_months(missing, month_start, month_end, grace_minutes)
+
+    result = {}
+    for e in employees:
+        if e["name"] in frozen:
+            result[e["name"]] = frozen[e["name"]]
+        elif e["name"] in live:
+            result[e["name"]] = live[e["name"]]
+    return result
+
+
+def _get_employee_page(cursor: Optional[str], page_size: int) -> List[Dict[str, Any]]:
+    """Active employees ordered by name, strictly after `cursor` (keyset pagination)."""
+    filters: Dict[str, Any] = {"status": "Active"}
+    if cursor:
+        filters["name"] = [">", cursor]
+    return frappe.db.get_all(
+        "Employee",
+        filters=filters,
+        fields=["name", "employee_name", "holiday_list"],
+        order_by="name asc",
+        limit=page_size,
+    )
+
+
+def iter_employee_holiday_names(
+    month: Optional[str] = None,
+    grace_minutes: int = 0,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Yield (employee, month payload) for every active employee, one page in memory at a time."""
+    month_start, month_end = _parse_month_to_range(month)
+    while True:
+        employees = _get_employee_page(cursor, page_size)
+        if not employees:
+            return
+        yield from _build_or_thaw(employees, month_start, month_end, grace_minutes).items()
+        if len(employees) < page_size:
+            return
+        cursor = employees[-1]["name"]
+
+
+# -----------------------------
+# Main API
+# -----------------------------
+@frappe.whitelist()
+def get_employee_holiday_names(
+    employee: Optional[str] = None,
+    month: Optional[str] = None,
+    grace_minutes: int = 0,
+    cursor: Optional[str] = None,
+    page_size: Optional[int] = None,
+):
+    """
+    Returns per-employee day records with:
+      - holiday_name: "WO" (if weekly_off=1) else holiday description (or "")
+      - check_in, check_out, total_hours
+      - leave_type, leave_description, half_day (0/1)
+      - is_late (0/1), late_by_minutes (int)
+
+    Also adds:
+      - weekly_working_hours: {"YYYY-Www": float_hours}
+      - total_working_hours: float_hours
+
+    Employees may read their own month; HR can read anyone's. Without
+    `employee` (HR only), the organisation is returned one page at a time:
+    pass `page_size` (default DEFAULT_PAGE_SIZE) and the previous response's
+    `next_cursor` as `cursor`:
+      {"employees": {emp_id: {...}}, "next_cursor": "FI-00123" | None}
+    """
+    month_start, month_end = _parse_month_to_range(month)
+
+    if employee:
+        if not set(ORG_WIDE_ROLES) & set(frappe.get_roles()):
+            own = frappe.db.get_value("Employee", {"user_id": frappe.session.user}, "name")
+            if employee != own:
+                frappe.throw(f"Not permitted to view the attendance of {employee}.", exc=frappe.PermissionError)
+
+        cached = get_cached_month(employee, month_start, grace_minutes)
+        if cached is not None:
+            return cached
+
+        employees = frappe.db.get_all(
+            "Employee",
+            filters={"status": "Active", "name": employee},
+            fields=["name", "employee_name", "holiday_list"],
+            limit=None,
+        )
+        result = _build_or_thaw(employees, month_start, month_end, grace_minutes).get(employee, {})
+        set_cached_month(employee, month_start, grace_minutes, result)
+        return result
+
+    frappe.only_for(ORG_WIDE_ROLES)
+    page_size = min(int(page_size or DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE)
+    employees = _get_employee_page(cursor, page_size)
+    return {
+        "employees": _build_or_thaw(employees, month_start, month_end, grace_minutes),
+        "next_cursor": employees[-1]["name"] if len(employees) == page_size else None,
+    }
+
+
+@frappe.whitelist()
+def download_employee_holiday_names(
+    month: Optional[str] = None,
+    grace_minutes: int = 0,
+    page_size: int = DEFAULT_PAGE_SIZE,
+):
+    """
+    Org-wide month as NDJSON, one `{"employee": ..., **payload}` object per line.
+
+    Lines are produced by `iter_employee_holiday_names` and spooled to a
+    temporary file (disk-backed past SPOOL_MAX_BYTES), so memory is bounded by
+    `page_size` rather than headcount.
+    """
+    frappe.only_for(ORG_WIDE_ROLES)
+    page_size = min(int(page_size or DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE)
+    month_start, _ = _parse_month_to_range(month)
+
+    buffer = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    for emp_id, payload in iter_employee_holiday_names(month, grace_minutes, page_size):
+        line = json.dumps({"employee": emp_id, **payload}, default=str, separators=(",", ":"))
+        buffer.write(line.encode() + b"\n")
+    buffer.seek(0)
+
+    response = Response(
+        wrap_file(frappe.local.request.environ, buffer),
+        mimetype="application/x-ndjson",
+        direct_passthrough=True,
+    )
+    response.headers["Content-Disposition"] = (
+        f'attachment; filename="attendance-{month_start.strftime("%Y-%m")}.ndjson"'
+    )
+    return response
+
+
+# -----------------------------
+# Scheduled jobs
+# -----------------------------
+def freeze_month(month_start: datetime.date, page_size: int = DEFAULT_PAGE_SIZE) -> int:
+    """Compute a locked month from live data and store one compressed snapshot per employee."""
+    month_end = add_days(add_months(month_start, 1), -1)
+    frozen, cursor = 0, None
+    while True:
+        employees = _get_employee_page(cursor, page_size)
+        if not employees:
+            break
+        frozen += save_snapshots(month_start, _build_employee_months(employees, month_start, month_end))
+        frappe.db.commit()
+        if len(employees) < page_size:
+            break
+        cursor = employees[-1]["name"]
+
+    mark_month_frozen(month_start)
+    frappe.db.commit()
+    return frozen
+
+
+def freeze_closed_months():
+    """scheduler_events (daily): snapshot months locked by a submitted Payroll Entry."""
+    for month_start in get_months_to_freeze(FREEZE_MONTHS_PER_RUN):
+        freeze_month(month_start)
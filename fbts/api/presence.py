@@ -0,0 +1,189 @@
+import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+import frappe
+from frappe.utils import get_datetime, getdate, today
+
+PRESENCE_PREFIX = "fbts:presence"
+PRESENCE_TTL = 2 * 24 * 60 * 60
+PRESENCE_EVENT = "fbts_presence_update"
+REALTIME_CONF_KEY = "fbts_presence_realtime"
+GROUP_BYS = ("department", "branch")
+UNASSIGNED = "Unassigned"
+SEEDED_FIELD = "__seeded__"
+
+# KEYS[1] = counters hash, KEYS[2] = per-employee state hash
+# ARGV[1] = employee, ARGV[2] = "in" | "out", ARGV[3] = punch time, ARGV[4] = ttl,
+# ARGV[5..] = counter prefixes the employee belongs to ("all", "department:<x>", ...)
+# Moves the employee from their previous state to the new one; punches older
+# than the recorded one are ignored, so replays and out-of-order batches are safe.
+_RECORD_SCRIPT = """
+local cur = redis.call('HGET', KEYS[2], ARGV[1])
+local prev = nil
+if cur then
+    local sep = string.find(cur, '|', 1, true)
+    if string.sub(cur, sep + 1) > ARGV[3] then
+        return 0
+    end
+    prev = string.sub(cur, 1, sep - 1)
+end
+redis.call('HSET', KEYS[2], ARGV[1], ARGV[2] .. '|' .. ARGV[3])
+if prev ~= ARGV[2] then
+    for i = 5, #ARGV do
+        if prev then
+            redis.call('HINCRBY', KEYS[1], ARGV[i] .. ':' .. prev, -1)
+        end
+        redis.call('HINCRBY', KEYS[1], ARGV[i] .. ':' .. ARGV[2], 1)
+    end
+end
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[4]))
+redis.call('EXPIRE', KEYS[2], tonumber(ARGV[4]))
+return 1
+"""
+
+
+# -----------------------------
+# Helpers
+# -----------------------------
+def _counters_key(day: datetime.date) -> str:
+    return frappe.cache().make_key(f"{PRESENCE_PREFIX}:{day}")
+
+
+def _employees_key(day: datetime.date) -> str:
+    return frappe.cache().make_key(f"{PRESENCE_PREFIX}:{day}:employees")
+
+
+def _record_script():
+    script = getattr(frappe.local, "fbts_presence_script", None)
+    if script is None:
+        script = frappe.local.fbts_presence_script = frappe.cache().register_script(_RECORD_SCRIPT)
+    return script
+
+
+def _prefixes(department: Optional[str], branch: Optional[str]) -> List[str]:
+    return ["all", f"department:{department or UNASSIGNED}", f"branch:{branch or UNASSIGNED}"]
+
+
+def _seed_totals(day: datetime.date) -> None:
+    """Store today's active headcount per department and branch next to the counters."""
+    rows = frappe.db.sql(
+        """
+        SELECT department, branch, COUNT(*) AS headcount
+        FROM `tabEmployee`
+        WHERE status = 'Active'
+        GROUP BY department, branch
+        """,
+        as_dict=True,
+    )
+    totals: Dict[str, int] = {}
+    for r in rows:
+        for prefix in _prefixes(r.department, r.branch):
+            totals[f"{prefix}:total"] = totals.get(f"{prefix}:total", 0) + r.headcount
+
+    key = _counters_key(day)
+    conn = frappe.cache()
+    pipe = conn.pipeline()
+    for field, count in totals.items():
+        pipe.hset(key, field, count)
+    pipe.hset(key, SEEDED_FIELD, 1)
+    pipe.expire(key, PRESENCE_TTL)
+    pipe.execute()
+
+
+# -----------------------------
+# Maintenance
+# -----------------------------
+def record_punches(punches: Iterable[Dict[str, Any]]) -> None:
+    """
+    Apply punches ({"employee", "log_type", "time"}) to today's presence counters.
+
+    Punches for other days are ignored; the counters only describe today.
+    """
+    current = getdate(today())
+    todays = [p for p in punches if get_datetime(p["time"]).date() == current]
+    if not todays:
+        return
+
+    groups = {
+        r.name: r
+        for r in frappe.db.get_all(
+            "Employee",
+            filters={"name": ["in", list({p["employee"] for p in todays})]},
+            fields=["name", "department", "branch"],
+        )
+    }
+    script = _record_script()
+    keys = [_counters_key(current), _employees_key(current)]
+    changed = []
+    for p in sorted(todays, key=lambda p: get_datetime(p["time"])):
+        emp = groups.get(p["employee"])
+        if not emp:
+            continue
+        state = "in" if p["log_type"] == "IN" else "out"
+        args = [p["employee"], state, str(get_datetime(p["time"])), PRESENCE_TTL] + _prefixes(emp.department, emp.branch)
+        if script(keys=keys, args=args):
+            changed.append({"department": emp.department, "branch": emp.branch, "state": state})
+
+    if changed and frappe.conf.get(REALTIME_CONF_KEY):
+        frappe.publish_realtime(PRESENCE_EVENT, {"date": str(current), "changes": changed}, after_commit=True)
+
+
+def record_punch(employee: str, log_type: str, time) -> None:
+    record_punches([{"employee": employee, "log_type": log_type, "time": time}])
+
+
+# -----------------------------
+# Scheduled jobs
+# -----------------------------
+def reset_presence_counters():
+    """
+    Start the day with today's headcounts. Counters are keyed by date, so a new
+    day starts from zero and yesterday's keys simply expire.
+    """
+    _seed_totals(getdate(today()))
+
+
+# -----------------------------
+# Main API
+# -----------------------------
+@frappe.whitelist()
+def get_presence_counts(group_by: str = "department"):
+    """
+    Live checked-in / checked-out / not-yet-arrived counts for today, per department or branch.
+
+    Served from counters maintained by create_checkin and the bulk ingest path;
+    cost depends on the number of groups, not on the number of check-ins.
+    Subscribe to `fbts_presence_update` for push updates when the
+    `fbts_presence_realtime` site config flag is set.
+    """
+    if group_by not in GROUP_BYS:
+        frappe.throw(f"group_by must be one of {', '.join(GROUP_BYS)}", exc=frappe.ValidationError)
+
+    current = getdate(today())
+    key = _counters_key(current)
+    # Raw pipeline calls: RedisWrapper's own hash methods pickle values, these are plain integers.
+    counters = frappe.cache().pipeline().hgetall(key).execute()[0]
+    if SEEDED_FIELD.encode() not in counters:
+        _seed_totals(current)
+        counters = frappe.cache().pipeline().hgetall(key).execute()[0]
+
+    groups: Dict[str, Dict[str, int]] = {}
+    overall = {"checked_in": 0, "checked_out": 0, "not_arrived": 0, "total": 0}
+    for field, value in counters.items():
+        field = field.decode() if isinstance(field, bytes) else field
+        if field == SEEDED_FIELD:
+            continue
+        prefix, _sep, state = field.rpartition(":")
+        dim, _sep, name = prefix.partition(":")
+        if dim == "all":
+            bucket = overall
+        elif dim == group_by:
+            bucket = groups.setdefault(name, {"checked_in": 0, "checked_out": 0, "not_arrived": 0, "total": 0})
+        else:
+            continue
+        bucket[{"in": "checked_in", "out": "checked_out", "total": "total"}[state]] = int(value)
+
+    for bucket in [overall, *groups.values()]:
+        bucket["not_arrived"] = max(bucket["total"] - bucket["checked_in"] - bucket["checked_out"], 0)
+
+    return {"date": str(current), "group_by": group_by, "all": overall, "groups": groups}
@@ -1,16 +1,10 @@
 import frappe
 
+from fbts.api.checkins import get_open_regularise_requests, get_out_of_fence_checkins, get_recent_checkins
+
 @frappe.whitelist(allow_guest=True)
 def get_employee_checkins(employee: str):
-    filters = {"employee": employee}
-    rows = frappe.db.get_all(
-        "Employee Checkin",
-        fields=["name", "employee", "employee_name", "log_type", "time"],
-        filters=filters,
-        order_by="time desc",
-        limit=5
-    )
-    return rows
+    return get_recent_checkins(employee, limit=5)
 
 
 import frappe
@@ -59,15 +53,13 @@ import frappe
 
 @frappe.whitelist(allow_guest=True)
 def get_regularise_request(custom_regularise_approver: str):
-    filters = {"custom_regularise_approver": custom_regularise_approver,"custom_status":"Open"}
-    rows = frappe.db.get_all(
-        "Employee Checkin",
-        fields=["name", "employee", "employee_name", "log_type", "time","custom_regularise_time","custom_regularise_approver"],
-        filters=filters,
-        order_by="time desc",
-        limit=5
-    )
-    return rows
+    return get_open_regularise_requests(custom_regularise_approver, limit=5)
+
+
+@frappe.whitelist(allow_guest=True)
+def get_out_of_fence_requests(custom_regularise_approver: str, limit: int = 20):
+    """Punches flagged outside every office geofence that still need the approver's review."""
+    return get_out_of_fence_checkins(custom_regularise_approver, limit=limit)
 
 
 
@@ -75,6 +67,11 @@ def get_regularise_request(custom_regularise_approver: str):
 
 import frappe
 
+from fbts.api.attendance_cache import invalidate_employee_months
+from fbts.api.attendance_generation import mark_dirty
+from fbts.api.attendance_summary import refresh_daily_summary
+from fbts.api.checkin_state import forget_state
+
 @frappe.whitelist(allow_guest=True)
 def apply_regularise_time(name: str, custom_status: str):
     """
@@ -100,6 +97,11 @@ def apply_regularise_time(name: str, custom_status: str):
             {"time": doc.custom_regularise_time, "custom_status": "Approved"},
             update_modified=True,
         )
+        refresh_daily_summary(doc.employee, [doc.time, doc.custom_regularise_time])
+        invalidate_employee_months(doc.employee, doc.time)
+        invalidate_employee_months(doc.employee, doc.custom_regularise_time)
+        forget_state(doc.employee)
+        mark_dirty(doc.employee, [doc.time, doc.custom_regularise_time])
         action = "updated_time_to_regularised"
 
     elif custom_status == "Rejected":
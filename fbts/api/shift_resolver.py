@@ -0,0 +1,114 @@
+import datetime
+from bisect import bisect_right
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import frappe
+from frappe.utils import add_days, add_months, get_first_day, getdate
+from frappe.utils.caching import request_cache
+
+ROSTER_CACHE_KEY = "fbts:shift_roster"
+
+# (start_date, end_date or None, shift_type, start_time, end_time)
+RosterEntry = Tuple[datetime.date, Optional[datetime.date], str, Optional[datetime.timedelta], Optional[datetime.timedelta]]
+
+
+# -----------------------------
+# Roster
+# -----------------------------
+def _build_month_roster(month_start: datetime.date) -> Dict[str, List[RosterEntry]]:
+    """Submitted, active Shift Assignments overlapping the month, sorted by start per employee."""
+    month_end = add_days(add_months(month_start, 1), -1)
+    rows = frappe.db.sql(
+        """
+        SELECT sa.employee, sa.start_date, sa.end_date, sa.shift_type, st.start_time, st.end_time
+        FROM `tabShift Assignment` sa
+        LEFT JOIN `tabShift Type` st ON st.name = sa.shift_type
+        WHERE sa.docstatus = 1
+          AND sa.status = 'Active'
+          AND sa.start_date <= %(month_end)s
+          AND (sa.end_date IS NULL OR sa.end_date >= %(month_start)s)
+        ORDER BY sa.employee, sa.start_date, sa.creation
+        """,
+        {"month_start": month_start, "month_end": month_end},
+        as_dict=True,
+    )
+
+    roster: Dict[str, List[RosterEntry]] = defaultdict(list)
+    for r in rows:
+        roster[r["employee"]].append((
+            getdate(r["start_date"]),
+            getdate(r["end_date"]) if r.get("end_date") else None,
+            r["shift_type"],
+            r.get("start_time"),
+            r.get("end_time"),
+        ))
+    return dict(roster)
+
+
+def get_month_roster(month_start) -> Dict[str, List[RosterEntry]]:
+    """Per-month roster, precomputed once and kept in Redis until a shift change invalidates it."""
+    month_start = get_first_day(getdate(month_start))
+    field = month_start.strftime("%Y-%m")
+    roster = frappe.cache().hget(ROSTER_CACHE_KEY, field)
+    if roster is None:
+        roster = _build_month_roster(month_start)
+        frappe.cache().hset(ROSTER_CACHE_KEY, field, roster)
+    return roster
+
+
+def invalidate_rosters(doc=None, method=None):
+    """doc_events hook for Shift Assignment / Shift Type."""
+    frappe.cache().delete_value(ROSTER_CACHE_KEY)
+
+
+# -----------------------------
+# Resolver
+# -----------------------------
+class ShiftResolver:
+    """Answers "which shift does employee X work on date D" for a date range."""
+
+    def __init__(self, from_date, to_date):
+        entries: Dict[str, set] = defaultdict(set)
+        cur, last = get_first_day(getdate(from_date)), get_first_day(getdate(to_date))
+        while cur <= last:
+            for employee, rows in get_month_roster(cur).items():
+                entries[employee].update(rows)
+            cur = add_months(cur, 1)
+
+        self._entries: Dict[str, List[RosterEntry]] = {}
+        self._starts: Dict[str, List[datetime.date]] = {}
+        for employee, rows in entries.items():
+            ordered = sorted(rows, key=lambda e: e[0])
+            self._entries[employee] = ordered
+            self._starts[employee] = [e[0] for e in ordered]
+
+    def entries(self) -> Dict[str, List[RosterEntry]]:
+        return self._entries
+
+    def shift_on(self, employee: str, d) -> Optional[RosterEntry]:
+        """Assignment in effect on `d` (the latest-starting one if several)."""
+        starts = self._starts.get(employee)
+        if not starts:
+            return None
+        d = getdate(d)
+        i = bisect_right(starts, d) - 1
+        while i >= 0:
+            entry = self._entries[employee][i]
+            if entry[1] is None or entry[1] >= d:
+                return entry
+            i -= 1
+        return None
+
+    def shift_for(self, employee: str, d) -> Optional[str]:
+        entry = self.shift_on(employee, d)
+        return entry[2] if entry else None
+
+    def shift_start(self, employee: str, d) -> Optional[datetime.timedelta]:
+        entry = self.shift_on(employee, d)
+        return entry[3] if entry else None
+
+
+@request_cache
+def get_shift_resolver(from_date, to_date) -> ShiftResolver:
+    return ShiftResolver(from_date, to_date)
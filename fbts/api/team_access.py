@@ -0,0 +1,46 @@
+from typing import List, Optional
+
+import frappe
+
+# Who may look at someone else's team. Everyone else is limited to the
+# employees whose leave approver or reporting manager they are.
+TEAM_MANAGER_ROLES = ("HR Manager", "System Manager")
+
+# Employees (aliased `e`) whose leave approver / reporting manager is %(approver)s.
+TEAM_CONDITION = """(
+    e.leave_approver = %(approver)s
+    OR e.reports_to IN (SELECT m.name FROM `tabEmployee` m WHERE m.user_id = %(approver)s)
+)"""
+
+
+def is_hr(user: Optional[str] = None) -> bool:
+    return bool(set(TEAM_MANAGER_ROLES) & set(frappe.get_roles(user or frappe.session.user)))
+
+
+def resolve_approver(approver: Optional[str] = None) -> str:
+    """`approver`, defaulting to the caller; only HR may name another user."""
+    user = frappe.session.user
+    if approver and approver != user and not is_hr(user):
+        frappe.throw(f"Not permitted to view the team of {approver}.", exc=frappe.PermissionError)
+    return approver or user
+
+
+def team_of(approver: str) -> List[str]:
+    """Active employees whose leave approver / reporting manager is `approver`."""
+    return frappe.db.sql_list(
+        f"SELECT e.name FROM `tabEmployee` e WHERE e.status = 'Active' AND {TEAM_CONDITION}",
+        {"approver": approver},
+    )
+
+
+def restrict_to_team(employees: List[str]) -> List[str]:
+    """`employees`, if HR or all of them are the caller or the caller's team; else PermissionError."""
+    user = frappe.session.user
+    if is_hr(user):
+        return employees
+    allowed = set(team_of(user))
+    allowed.update(frappe.db.get_all("Employee", filters={"user_id": user}, pluck="name"))
+    outside = [e for e in employees if e not in allowed]
+    if outside:
+        frappe.throw(f"Not permitted to view {', '.join(outside[:5])}.", exc=frappe.PermissionError)
+    return employees
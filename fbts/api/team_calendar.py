@@ -0,0 +1,169 @@
+import datetime
+import hashlib
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import frappe
+from frappe.utils import add_days, date_diff, getdate
+
+from fbts.api.generation_cache import bump_generation, get_generation
+from fbts.api.leave_index import LeaveIntervalIndex, load_leave_index
+from fbts.api.team_access import TEAM_CONDITION, is_hr, resolve_approver, restrict_to_team
+
+CACHE_PREFIX = "fbts:team_calendar"
+CACHE_TTL = 60 * 60  # 1 hour; also bounds staleness from team membership changes
+MAX_RANGE_DAYS = 366
+
+TEAM_QUERY = """
+    SELECT e.name, e.employee_name, COALESCE(NULLIF(e.holiday_list, ''), c.default_holiday_list) AS holiday_list
+    FROM `tabEmployee` e
+    LEFT JOIN `tabCompany` c ON c.name = e.company
+    WHERE e.status = 'Active' AND {conditions}
+    ORDER BY e.employee_name, e.name
+"""
+
+
+# -----------------------------
+# Helpers
+# -----------------------------
+def _cache_key(employees: Tuple[str, ...], from_date: datetime.date, to_date: datetime.date) -> str:
+    team = hashlib.sha1(",".join(employees).encode()).hexdigest()[:16]
+    return f"{CACHE_PREFIX}:{get_generation(CACHE_PREFIX)}:{team}:{from_date}:{to_date}"
+
+
+def _team_rows(
+    employees: Optional[List[str]], department: Optional[str], approver: Optional[str]
+) -> List[Dict[str, Any]]:
+    """The requested team; outside HR it never reaches beyond the caller's own team."""
+    if employees:
+        conditions, values = "e.name IN %(employees)s", {"employees": tuple(restrict_to_team(employees))}
+    elif department:
+        conditions, values = "e.department = %(department)s", {"department": department}
+        if not is_hr():
+            conditions += f" AND {TEAM_CONDITION}"
+            values["approver"] = frappe.session.user
+    else:
+        conditions, values = TEAM_CONDITION, {"approver": resolve_approver(approver)}
+    return frappe.db.sql(TEAM_QUERY.format(conditions=conditions), values, as_dict=True)
+
+
+def merge_dates(dates: Iterable[datetime.date]) -> List[Tuple[datetime.date, datetime.date]]:
+    """Collapse dates into [start, end] runs of consecutive days."""
+    runs: List[List[datetime.date]] = []
+    for d in sorted(set(dates)):
+        if runs and d == add_days(runs[-1][1], 1):
+            runs[-1][1] = d
+        else:
+            runs.append([d, d])
+    return [(a, b) for a, b in runs]
+
+
+def _holiday_intervals(holiday_lists: List[str], from_date, to_date) -> Dict[str, Dict[str, list]]:
+    """{holiday_list: {"holidays": [[a, b]], "weekly_offs": [[a, b]]}} from one query over every list."""
+    dates: Dict[str, Dict[str, List[datetime.date]]] = defaultdict(lambda: {"holidays": [], "weekly_offs": []})
+    if holiday_lists:
+        for parent, holiday_date, weekly_off in frappe.db.sql(
+            """
+            SELECT parent, holiday_date, weekly_off
+            FROM `tabHoliday`
+            WHERE parent IN %(lists)s AND holiday_date BETWEEN %(from_date)s AND %(to_date)s
+            """,
+            {"lists": tuple(holiday_lists), "from_date": from_date, "to_date": to_date},
+        ):
+            dates[parent]["weekly_offs" if weekly_off else "holidays"].append(getdate(holiday_date))
+
+    return {
+        hlist: {kind: [[str(a), str(b)] for a, b in merge_dates(days)] for kind, days in dates[hlist].items()}
+        for hlist in holiday_lists
+    }
+
+
+def _leave_intervals(leaves: LeaveIntervalIndex, employee: str, from_date, to_date) -> List[list]:
+    """[[from, to, half_day]] runs, full days and half days kept apart; a full day wins a clash."""
+    full: List[datetime.date] = []
+    half: List[datetime.date] = []
+    for row in leaves.overlapping(employee, from_date, to_date):
+        half_date = getdate(row.get("half_day_date") or row["from_date"]) if row.get("half_day") else None
+        d, stop = max(row["from_date"], from_date), min(row["to_date"], to_date)
+        while d <= stop:
+            (half if d == half_date else full).append(d)
+            d = add_days(d, 1)
+    half = set(half) - set(full)
+
+    runs = [(a, b, 0) for a, b in merge_dates(full)] + [(a, b, 1) for a, b in merge_dates(half)]
+    return [[str(a), str(b), flag] for a, b, flag in sorted(runs)]
+
+
+def _build_calendar(rows: List[Dict[str, Any]], from_date: datetime.date, to_date: datetime.date) -> Dict[str, Any]:
+    leaves = load_leave_index(tuple(r.name for r in rows), from_date, to_date)
+    holiday_lists = sorted({r.holiday_list for r in rows if r.holiday_list})
+
+    return {
+        "from_date": str(from_date),
+        "to_date": str(to_date),
+        "holiday_lists": _holiday_intervals(holiday_lists, from_date, to_date),
+        "employees": {
+            r.name: {
+                "employee_name": r.employee_name,
+                "holiday_list": r.holiday_list,
+                "leaves": _leave_intervals(leaves, r.name, from_date, to_date),
+            }
+            for r in rows
+        },
+    }
+
+
+# -----------------------------
+# doc_events
+# -----------------------------
+def invalidate_team_calendars(doc=None, method=None):
+    """Leave Application / Holiday List changes: orphan every cached calendar at once."""
+    bump_generation(CACHE_PREFIX)
+
+
+# -----------------------------
+# Main API
+# -----------------------------
+@frappe.whitelist()
+def get_team_calendar(
+    from_date: str,
+    to_date: str,
+    department: Optional[str] = None,
+    approver: Optional[str] = None,
+    employees=None,
+):
+    """
+    Who is away across a team for [from_date, to_date], as compact intervals.
+
+    The team is `employees` (list or JSON list), else everyone in `department`,
+    else everyone whose leave approver / reporting manager is `approver`
+    (default: the caller). Outside HR Manager / System Manager all three are
+    limited to the caller's own team.
+
+    Approved leaves are merged per employee into [from, to, half_day] runs
+    (half_day 1 for half-day dates); holidays and weekly offs are merged once
+    per holiday list and referenced by name:
+
+    {
+        "from_date": "2026-10-01", "to_date": "2026-12-31",
+        "holiday_lists": {"HL-2026": {"holidays": [["2026-10-20", "2026-10-21"]], "weekly_offs": [...]}},
+        "employees": {"EMP-0001": {"employee_name": "...", "holiday_list": "HL-2026",
+                                   "leaves": [["2026-11-03", "2026-11-06", 0], ["2026-11-07", "2026-11-07", 1]]}}
+    }
+    """
+    from_date, to_date = getdate(from_date), getdate(to_date)
+    if to_date < from_date:
+        frappe.throw("to_date must not be before from_date.", exc=frappe.ValidationError)
+    if date_diff(to_date, from_date) >= MAX_RANGE_DAYS:
+        frappe.throw(f"Date range cannot exceed {MAX_RANGE_DAYS} days.", exc=frappe.ValidationError)
+
+    if employees:
+        employees = frappe.parse_json(employees) if isinstance(employees, str) else employees
+    rows = _team_rows(employees, department, approver)
+
+    key = _cache_key(tuple(sorted(r.name for r in rows)), from_date, to_date)
+    calendar = frappe.cache().get_value(key)
+    if calendar is None:
+        calendar = _build_calendar(rows, from_date, to_date)
+        frappe.cache().set_value(key, calendar, expires_in_sec=CACHE_TTL)
+    return calendar
@@ -1,85 +1,73 @@
 import frappe
-from frappe.utils import getdate
+from frappe.utils import get_datetime
 from datetime import timedelta
 
+from fbts.api.attendance_summary import get_recent_attendance_days
+
+MAX_ATTENDANCE_DAYS = 100
+
+
+def format_date_human(dt):
+    day = dt.day
+    suffix = "th" if 11 <= day <= 13 else {1: "st", 2: "nd", 3: "rd"}.get(day % 10, "th")
+    return dt.strftime(f"%-d{suffix} %B %Y")
+
+
+def get_last_attendance_records(employee, n=10, from_date=None, to_date=None, date_formatter=format_date_human):
+    """
+    Shared engine for the "last N attendance days" endpoints.
+
+    Reads the first IN / last OUT of the `n` most recent days (capped at
+    MAX_ATTENDANCE_DAYS) from the daily summary, optionally within
+    [from_date, to_date]. Each record includes: employee, date, in_time,
+    out_time, status, working_hours.
+    """
+    n = max(1, min(int(n or 10), MAX_ATTENDANCE_DAYS))
+    records = []
+
+    for day in get_recent_attendance_days(employee, n, from_date, to_date):
+        in_time = get_datetime(day["first_in"]) if day["first_in"] else None
+        out_time = get_datetime(day["last_out"]) if day["last_out"] else None
+
+        # Calculate working hours if both in and out exist
+        working_hours = None
+        if in_time and out_time:
+            duration: timedelta = out_time - in_time
+            total_seconds = int(duration.total_seconds())
+            hours = total_seconds // 3600
+            minutes = (total_seconds % 3600) // 60
+            seconds = total_seconds % 60
+            working_hours = f"{hours:02}:{minutes:02}:{seconds:02}"
+
+        records.append({
+            "employee": employee,
+            "date": date_formatter(day["attendance_date"]),
+            "in_time": in_time.strftime("%H:%M:%S") if in_time else None,
+            "out_time": out_time.strftime("%H:%M:%S") if out_time else None,
+            "status": "Present" if in_time else "Absent",
+            "working_hours": working_hours
+        })
+
+    return records
+
+
 @frappe.whitelist(allow_guest=True)
-def get_last_10_attendance_records(employee):
+def get_last_10_attendance_records(employee, n=10, from_date=None, to_date=None):
     """
-    Returns the latest 10 attendance records for a given employee.
+    Returns the latest `n` (default 10) attendance records for a given employee.
     Each record includes: employee, date, in_time, out_time, status, working_hours.
-    
+
     :param employee: Employee ID (e.g., "FI-00001")
+    :param from_date / to_date: optional window for the days considered
     """
-    def format_date_human(dt):
-        day = dt.day
-        suffix = "th" if 11 <= day <= 13 else {1: "st", 2: "nd", 3: "rd"}.get(day % 10, "th")
-        return dt.strftime(f"%-d{suffix} %B %Y")
-
     try:
         if not employee:
             return {"status": "error", "message": "Employee ID is required"}
 
-        # Fetch check-ins ordered by time (most recent first)
-        checkins = frappe.db.sql("""
-            SELECT 
-                employee,
-                log_type,
-                time AS log_time
-            FROM `tabEmployee Checkin`
-            WHERE employee = %s
-            ORDER BY time DESC
-        """, (employee,), as_dict=True)
-
-        attendance = {}
-        record_count = 0
-
-        for entry in checkins:
-            log_date = entry["log_time"].date()
-            date_key = format_date_human(log_date)
-
-            if date_key not in attendance:
-                if record_count == 10:
-                    break  # limit to 10 records
-                attendance[date_key] = {
-                    "employee": employee,
-                    "date": date_key,
-                    "in_time": None,
-                    "out_time": None,
-                    "status": "Absent",
-                    "working_hours": None
-                }
-                record_count += 1
-
-            if entry["log_type"] == "IN" and attendance[date_key]["in_time"] is None:
-                attendance[date_key]["in_time"] = entry["log_time"]
-            elif entry["log_type"] == "OUT" and attendance[date_key]["out_time"] is None:
-                attendance[date_key]["out_time"] = entry["log_time"]
-
-        # Format and calculate working hours
-        for record in attendance.values():
-            in_time = record["in_time"]
-            out_time = record["out_time"]
-
-            if in_time:
-                record["status"] = "Present"
-            record["in_time"] = in_time.strftime("%H:%M:%S") if in_time else None
-            record["out_time"] = out_time.strftime("%H:%M:%S") if out_time else None
-
-            # Calculate working hours if both in and out exist
-            if in_time and out_time:
-                duration: timedelta = out_time - in_time
-                total_seconds = int(duration.total_seconds())
-                hours = total_seconds // 3600
-                minutes = (total_seconds % 3600) // 60
-                seconds = total_seconds % 60
-                record["working_hours"] = f"{hours:02}:{minutes:02}:{seconds:02}"
-            else:
-                record["working_hours"] = None
-
         return {
             "status": "success",
             "employee": employee,
-            "records": list(attendance.values())
+            "records": get_last_attendance_records(employee, n, from_date, to_date)
         }
 
     except Exception as e:
@@ -0,0 +1,15 @@
+# Copyright (c) 2026, Urvish Sanghvi and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class AttendanceAnomaly(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_unique("Attendance Anomaly", ["checkin", "anomaly_type"])
+	frappe.db.add_index("Attendance Anomaly", ["employee", "attendance_date", "status"])
+	frappe.db.add_index("Attendance Anomaly", ["status", "attendance_date"])
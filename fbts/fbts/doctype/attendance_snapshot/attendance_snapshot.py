@@ -0,0 +1,16 @@
+# Copyright (c) 2026, Urvish Sanghvi and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe import _
+from frappe.model.document import Document
+
+
+class AttendanceSnapshot(Document):
+	def validate(self):
+		if not self.is_new():
+			frappe.throw(_("Attendance Snapshots are immutable; delete and re-freeze the month instead."))
+
+
+def on_doctype_update():
+	frappe.db.add_unique("Attendance Snapshot", ["employee", "month"])
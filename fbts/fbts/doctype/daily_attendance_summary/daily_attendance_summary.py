@@ -0,0 +1,13 @@
+# Copyright (c) 2026, Urvish Sanghvi and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class DailyAttendanceSummary(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_unique("Daily Attendance Summary", ["employee", "attendance_date"])
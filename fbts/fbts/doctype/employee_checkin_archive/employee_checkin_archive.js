@@ -0,0 +1,8 @@
+// Copyright (c) 2026, Urvish Sanghvi and contributors
+// For license information, please see license.txt
+
+// frappe.ui.form.on("Employee Checkin Archive", {
+// 	refresh(frm) {
+
+// 	},
+// });
@@ -0,0 +1,14 @@
+# Copyright (c) 2026, Urvish Sanghvi and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class EmployeeCheckinArchive(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("Employee Checkin Archive", ["employee", "time"], index_name="employee_time_index")
+	frappe.db.add_index("Employee Checkin Archive", ["time"], index_name="time_index")
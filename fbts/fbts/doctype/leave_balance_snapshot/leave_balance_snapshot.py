@@ -0,0 +1,13 @@
+# Copyright (c) 2026, Urvish Sanghvi and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class LeaveBalanceSnapshot(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("Leave Balance Snapshot", ["employee", "period_start", "period_end"])
@@ -0,0 +1,16 @@
+# Copyright (c) 2026, Urvish Sanghvi and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe import _
+from frappe.model.document import Document
+
+from fbts.api.geofence import MAX_RADIUS_M
+
+
+class OfficeGeofence(Document):
+	def validate(self):
+		if not -90 <= (self.latitude or 0) <= 90 or not -180 <= (self.longitude or 0) <= 180:
+			frappe.throw(_("Latitude must be within ±90 and longitude within ±180."))
+		if not 0 < (self.radius or 0) <= MAX_RADIUS_M:
+			frappe.throw(_("Radius must be between 1 and {0} metres.").format(MAX_RADIUS_M))
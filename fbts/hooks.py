@@ -151,17 +151,117 @@ whitelisted_methods = [
 # ---------------
 # Hook on document methods and events
 
-# doc_events = {
-# 	"*": {
-# 		"on_update": "method",
-# 		"on_cancel": "method",
-# 		"on_trash": "method"
-# 	}
-# }
+doc_events = {
+	"Employee Checkin": {
+		"validate": "fbts.api.geofence.set_checkin_geofence",
+		"on_update": [
+			"fbts.api.attendance_summary.on_checkin_update",
+			"fbts.api.attendance_cache.on_checkin_change",
+			"fbts.api.checkin_state.on_checkin_change",
+			"fbts.api.attendance_generation.on_checkin_regularised",
+		],
+		"after_delete": [
+			"fbts.api.attendance_summary.on_checkin_delete",
+			"fbts.api.attendance_cache.on_checkin_change",
+			"fbts.api.checkin_state.on_checkin_change",
+		],
+	},
+	"Leave Application": {
+		"on_update": [
+			"fbts.api.attendance_cache.on_leave_change",
+			"fbts.api.team_calendar.invalidate_team_calendars",
+		],
+		"on_update_after_submit": [
+			"fbts.api.attendance_cache.on_leave_change",
+			"fbts.api.team_calendar.invalidate_team_calendars",
+		],
+		"on_cancel": [
+			"fbts.api.attendance_cache.on_leave_change",
+			"fbts.api.leave_balance.on_leave_source_cancel",
+			"fbts.api.team_calendar.invalidate_team_calendars",
+		],
+		"after_delete": [
+			"fbts.api.attendance_cache.on_leave_change",
+			"fbts.api.team_calendar.invalidate_team_calendars",
+		],
+	},
+	"Leave Allocation": {
+		"on_cancel": "fbts.api.leave_balance.on_leave_source_cancel",
+	},
+	"Leave Encashment": {
+		"on_cancel": "fbts.api.leave_balance.on_leave_source_cancel",
+	},
+	"Leave Ledger Entry": {
+		"on_submit": "fbts.api.leave_balance.on_ledger_entry_change",
+		"on_cancel": "fbts.api.leave_balance.on_ledger_entry_change",
+	},
+	"Holiday List": {
+		"on_update": [
+			"fbts.api.attendance_cache.on_schedule_change",
+			"fbts.api.team_calendar.invalidate_team_calendars",
+		],
+		"after_delete": [
+			"fbts.api.attendance_cache.on_schedule_change",
+			"fbts.api.team_calendar.invalidate_team_calendars",
+		],
+	},
+	"Shift Assignment": {
+		"on_update": [
+			"fbts.api.shift_resolver.invalidate_rosters",
+			"fbts.api.attendance_cache.on_schedule_change",
+		],
+		"on_update_after_submit": [
+			"fbts.api.shift_resolver.invalidate_rosters",
+			"fbts.api.attendance_cache.on_schedule_change",
+		],
+		"on_cancel": [
+			"fbts.api.shift_resolver.invalidate_rosters",
+			"fbts.api.attendance_cache.on_schedule_change",
+		],
+		"after_delete": [
+			"fbts.api.shift_resolver.invalidate_rosters",
+			"fbts.api.attendance_cache.on_schedule_change",
+		],
+	},
+	"Office Geofence": {
+		"on_update": "fbts.api.geofence.invalidate_index",
+		"after_delete": "fbts.api.geofence.invalidate_index",
+	},
+	"Shift Type": {
+		"on_update": [
+			"fbts.api.shift_resolver.invalidate_rosters",
+			"fbts.api.attendance_cache.on_schedule_change",
+		],
+		"after_delete": [
+			"fbts.api.shift_resolver.invalidate_rosters",
+			"fbts.api.attendance_cache.on_schedule_change",
+		],
+	},
+}
 
 # Scheduled Tasks
 # ---------------
 
+scheduler_events = {
+	"cron": {
+		"* * * * *": [
+			"fbts.api.checkin_buffer.flush_checkin_buffer",
+		],
+		"*/15 * * * *": [
+			"fbts.api.attendance_generation.recompute_dirty_attendance",
+		],
+	},
+	"hourly": [
+		"fbts.api.anomalies.scan_attendance_anomalies",
+	],
+	"daily": [
+		"fbts.api.monthly.freeze_closed_months",
+		"fbts.api.checkin_archive.archive_old_checkins",
+		"fbts.api.presence.reset_presence_counters",
+		"fbts.api.attendance_generation.generate_daily_attendance",
+	],
+}
+
 # scheduler_events = {
 # 	"all": [
 # 		"fbts.tasks.all"
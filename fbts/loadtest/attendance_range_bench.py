@@ -0,0 +1,98 @@
+"""
+Benchmark for fbts.api.attendance_range.get_attendance_for_range against the
+per-day loop it replaces (fbts.api.monthly._build_employee_months).
+
+Run from the bench directory against a site with real (or seeded) data:
+
+    bench --site mysite.localhost execute fbts.loadtest.attendance_range_bench.run \
+        --kwargs "{'months': 3, 'iterations': 3}"
+
+The range is `from_date`..`to_date` when both are given, else the `months`
+calendar months (default 3) ending with `month` (default: the current one).
+Both engines read that range for every active employee; the report gives the
+best-of-N wall time of each, the speedup, and whether the late-day,
+late-minute and hour totals agree for every employee.
+"""
+
+import time
+
+import frappe
+from frappe.utils import add_months, getdate
+
+from fbts.api.attendance_range import get_attendance_for_range
+from fbts.api.monthly import _build_employee_months, _parse_month_to_range
+
+
+def _best_of(iterations, fn):
+    best, result = None, None
+    for _ in range(iterations):
+        # Both engines memoise per request; start every run cold.
+        frappe.local.request_cache.clear()
+        started = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def _loop_totals(months):
+    totals = {}
+    for employee, month in months.items():
+        days = month["days"]
+        totals[employee] = (
+            sum(r["is_late"] for r in days),
+            sum(r["late_by_minutes"] for r in days),
+            month["weekly_working_hours"],
+            month["total_working_hours"],
+        )
+    return totals
+
+
+def _bench_range(month, months, from_date, to_date):
+    if from_date and to_date:
+        return getdate(from_date), getdate(to_date)
+    month_start, month_end = _parse_month_to_range(month)
+    return add_months(month_start, -(int(months) - 1)), month_end
+
+
+def run(month=None, months=3, from_date=None, to_date=None, iterations=3, grace_minutes=0):
+    range_start, range_end = _bench_range(month, months, from_date, to_date)
+    employees = frappe.db.get_all(
+        "Employee",
+        filters={"status": "Active"},
+        fields=["name", "employee_name", "holiday_list"],
+        limit=None,
+    )
+
+    loop_s, months = _best_of(
+        iterations, lambda: _build_employee_months(employees, range_start, range_end, grace_minutes)
+    )
+    range_s, ranged = _best_of(
+        iterations, lambda: get_attendance_for_range(range_start, range_end, grace_minutes=grace_minutes)
+    )
+
+    expected = _loop_totals(months)
+    mismatches = [
+        employee
+        for employee, (late_days, late_minutes, weekly, total) in expected.items()
+        if employee in ranged
+        and (
+            ranged[employee]["late_days"],
+            ranged[employee]["late_minutes"],
+            ranged[employee]["weekly_working_hours"],
+            ranged[employee]["total_working_hours"],
+        )
+        != (late_days, late_minutes, weekly, total)
+    ]
+
+    report = {
+        "from_date": str(range_start),
+        "to_date": str(range_end),
+        "employees": len(employees),
+        "per_day_loop_s": round(loop_s, 4),
+        "range_engine_s": round(range_s, 4),
+        "speedup": round(loop_s / range_s, 1) if range_s else None,
+        "mismatches": mismatches[:20],
+    }
+    print(frappe.as_json(report))
+    return report
@@ -0,0 +1,189 @@
+"""
+Shift-start burst load test for fbts.api.flamingoApi.create_checkin.
+
+1. Seed synthetic employees on a local bench site:
+
+    bench --site mysite.localhost execute fbts.loadtest.checkin_burst.seed_employees \
+        --kwargs "{'count': 2000, 'company': 'My Company'}"
+
+   This writes their IDs to sites/mysite.localhost/loadtest_employees.json.
+
+2. Replay the burst against the running site (from the bench's env):
+
+    ./env/bin/python -m fbts.loadtest.checkin_burst \
+        --url http://mysite.localhost:8000 \
+        --employees-file sites/mysite.localhost/loadtest_employees.json \
+        --window 300 --concurrency 64 --token "<api_key>:<api_secret>"
+
+   Every employee taps once at an offset drawn from a triangular
+   distribution over the window (peaking early, like 9:00 AM). The report
+   covers p50/p95/p99 latency, error rate, throughput and InnoDB row-lock
+   waits during the run (the token must belong to a System Manager).
+
+3. Remove the synthetic data:
+
+    bench --site mysite.localhost execute fbts.loadtest.checkin_burst.cleanup_employees
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import frappe
+import requests
+
+EMPLOYEE_PREFIX = "LoadTest"
+EMPLOYEES_FILE = "loadtest_employees.json"
+CHECKIN_METHOD = "/api/method/fbts.api.flamingoApi.create_checkin"
+LOCK_STATS_METHOD = "/api/method/fbts.loadtest.checkin_burst.get_lock_stats"
+
+
+# -----------------------------
+# Site-side helpers (bench execute / whitelisted)
+# -----------------------------
+def seed_employees(count: int = 1000, company: str = None, seed: int = 42):
+    """Create `count` active synthetic employees and write their IDs to the site folder."""
+    company = company or frappe.defaults.get_global_default("company") or frappe.db.get_value("Company", {}, "name")
+    rng = random.Random(seed)
+    ids = []
+    for n in range(int(count)):
+        doc = frappe.get_doc({
+            "doctype": "Employee",
+            "first_name": EMPLOYEE_PREFIX,
+            "last_name": f"{n:06d}",
+            "gender": rng.choice(["Male", "Female"]),
+            "date_of_birth": f"{rng.randint(1970, 2002)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "date_of_joining": "2020-01-01",
+            "company": company,
+            "status": "Active",
+        })
+        doc.insert(ignore_permissions=True)
+        ids.append(doc.name)
+        if n % 500 == 499:
+            frappe.db.commit()
+    frappe.db.commit()
+
+    path = frappe.get_site_path(EMPLOYEES_FILE)
+    with open(path, "w") as fh:
+        json.dump(ids, fh)
+    print(f"Seeded {len(ids)} employees -> {path}")
+
+
+def cleanup_employees():
+    """Delete the synthetic employees and every check-in they made."""
+    ids = frappe.get_all("Employee", filters={"first_name": EMPLOYEE_PREFIX}, pluck="name")
+    if ids:
+        frappe.db.delete("Employee Checkin", {"employee": ["in", ids]})
+        frappe.db.delete("Daily Attendance Summary", {"employee": ["in", ids]})
+        frappe.db.delete("Employee", {"name": ["in", ids]})
+        frappe.db.commit()
+    print(f"Removed {len(ids)} employees")
+
+
+@frappe.whitelist()
+def get_lock_stats():
+    """InnoDB row-lock counters, sampled before and after a run."""
+    frappe.only_for("System Manager")
+    rows = frappe.db.sql(
+        "SHOW GLOBAL STATUS WHERE Variable_name LIKE 'Innodb_row_lock%%' OR Variable_name = 'Innodb_deadlocks'"
+    )
+    return {name: int(value) for name, value in rows}
+
+
+# -----------------------------
+# Client
+# -----------------------------
+def _percentile(sorted_values, p):
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return None
+    k = max(0, min(len(sorted_values) - 1, int(round(p / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[k]
+
+
+def _lock_stats(url, headers):
+    try:
+        res = requests.get(url + LOCK_STATS_METHOD, headers=headers, timeout=10)
+        res.raise_for_status()
+        return res.json().get("message") or {}
+    except requests.RequestException:
+        return {}
+
+
+def run_burst(url, employees, window, concurrency, token=None, seed=42):
+    rng = random.Random(seed)
+    headers = {"Authorization": f"token {token}"} if token else {}
+    schedule = sorted((rng.triangular(0, window, window * 0.2), emp) for emp in employees)
+
+    local = threading.local()
+    latencies, errors = [], []
+    lock = threading.Lock()
+    started = time.monotonic()
+
+    def tap(offset, employee):
+        delay = started + offset - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        t0 = time.perf_counter()
+        try:
+            res = session.post(url + CHECKIN_METHOD, data={"employee": employee}, headers=headers, timeout=60)
+            ok = res.status_code == 200
+            detail = None if ok else f"HTTP {res.status_code}"
+        except requests.RequestException as e:
+            ok, detail = False, type(e).__name__
+        elapsed = (time.perf_counter() - t0) * 1000.0
+        with lock:
+            latencies.append(elapsed)
+            if not ok:
+                errors.append(detail)
+
+    before = _lock_stats(url, headers)
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for offset, employee in schedule:
+            pool.submit(tap, offset, employee)
+    duration = time.monotonic() - started
+    after = _lock_stats(url, headers)
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "duration_s": round(duration, 2),
+        "throughput_rps": round(len(latencies) / duration, 2) if duration else None,
+        "p50_ms": _percentile(latencies, 50),
+        "p95_ms": _percentile(latencies, 95),
+        "p99_ms": _percentile(latencies, 99),
+        "max_ms": latencies[-1] if latencies else None,
+        "error_rate": round(len(errors) / len(latencies), 4) if latencies else None,
+        "errors": {e: errors.count(e) for e in set(errors)},
+        "lock_waits": {k: after[k] - before.get(k, 0) for k in after if k in before},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", required=True, help="Site base URL, e.g. http://mysite.localhost:8000")
+    parser.add_argument("--employees-file", required=True)
+    parser.add_argument("--window", type=float, default=300, help="Burst window in seconds")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--limit", type=int, default=None, help="Only replay the first N employees")
+    parser.add_argument("--token", default=None, help="api_key:api_secret")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with open(args.employees_file) as fh:
+        employees = json.load(fh)[: args.limit]
+
+    report = run_burst(args.url.rstrip("/"), employees, args.window, args.concurrency, args.token, args.seed)
+    for ms in ("p50_ms", "p95_ms", "p99_ms", "max_ms"):
+        report[ms] = round(report[ms], 1) if report[ms] is not None else None
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+import frappe
+
+
+def execute():
+	# fbts.api.anomalies scans new check-ins by `creation`
+	frappe.db.add_index("Employee Checkin", ["creation"], index_name="creation_index")
@@ -0,0 +1,14 @@
+import frappe
+
+
+def execute():
+	frappe.db.add_index("Employee Checkin", ["employee", "time"], index_name="employee_time_index")
+	# Org-wide day ranges (daily summary rebuilds, backfill, archival) filter on time alone.
+	frappe.db.add_index("Employee Checkin", ["time"], index_name="time_index")
+
+	if frappe.db.has_column("Employee Checkin", "custom_regularise_approver"):
+		frappe.db.add_index(
+			"Employee Checkin",
+			["custom_regularise_approver", "custom_status", "time"],
+			index_name="regularise_approver_index",
+		)
@@ -0,0 +1,10 @@
+import frappe
+
+
+def execute():
+	if frappe.db.has_column("Employee Checkin", "custom_geofence_status"):
+		frappe.db.add_index(
+			"Employee Checkin",
+			["custom_geofence_status", "employee", "time"],
+			index_name="geofence_status_index",
+		)
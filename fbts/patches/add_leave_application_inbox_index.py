@@ -0,0 +1,15 @@
+import frappe
+
+
+def execute():
+	frappe.db.add_index(
+		"Leave Application",
+		["leave_approver", "status", "posting_date", "name"],
+		index_name="leave_approver_inbox_index",
+	)
+	# Multi-status pages: ordered by (posting_date, name) without a filesort
+	frappe.db.add_index(
+		"Leave Application",
+		["leave_approver", "posting_date", "name"],
+		index_name="leave_approver_posting_index",
+	)
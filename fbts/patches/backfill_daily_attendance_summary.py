@@ -0,0 +1,5 @@
+from fbts.api.attendance_summary import rebuild_daily_summary
+
+
+def execute():
+	rebuild_daily_summary()
@@ -0,0 +1,11 @@
+import frappe
+
+from fbts.api.leave_balance import rebuild_leave_balance_snapshots
+
+
+def execute():
+	frappe.db.add_index(
+		"Leave Ledger Entry", ["employee", "leave_type", "from_date"], index_name="employee_leave_type_from_date_index"
+	)
+	frappe.db.add_index("Leave Ledger Entry", ["transaction_name"], index_name="transaction_name_index")
+	rebuild_leave_balance_snapshots()
@@ -0,0 +1,111 @@
+# Copyright (c) 2026, Urvish Sanghvi and Contributors
+# See license.txt
+
+import datetime
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_days, add_months, get_first_day, getdate
+
+from fbts.api.attendance_range import get_attendance_for_range
+from fbts.api.attendance_summary import _upsert_summary_rows
+from fbts.api.monthly import _build_employee_months
+from fbts.api.shift_resolver import invalidate_rosters
+
+TEST_EMPLOYEES = [f"_T-RNG-{i:03d}" for i in range(8)]
+TEST_SHIFTS = {"_T-RNG Morning": datetime.timedelta(hours=9), "_T-RNG Late": datetime.timedelta(hours=13)}
+GRACE_MINUTES = 10
+
+
+class TestAttendanceRange(FrappeTestCase):
+	@classmethod
+	def setUpClass(cls):
+		super().setUpClass()
+		cls.month_start = get_first_day(add_months(getdate(), -1))
+		cls.month_end = add_days(add_months(cls.month_start, 1), -1)
+
+		frappe.db.bulk_insert(
+			"Employee",
+			["name", "employee_name", "first_name", "status"],
+			[(e, e, e, "Active") for e in TEST_EMPLOYEES],
+			ignore_duplicates=True,
+		)
+		frappe.db.bulk_insert(
+			"Shift Type",
+			["name", "start_time", "end_time"],
+			[(name, start, start + datetime.timedelta(hours=8)) for name, start in TEST_SHIFTS.items()],
+			ignore_duplicates=True,
+		)
+
+		# Half the team changes shift mid-month, the rest have none on odd indexes.
+		mid = add_days(cls.month_start, 14)
+		assignments = []
+		for n, employee in enumerate(TEST_EMPLOYEES):
+			if n % 2:
+				continue
+			assignments.append((f"_T-RNG-SA-{n}-a", employee, "_T-RNG Morning", cls.month_start, mid, 1, "Active"))
+			assignments.append((f"_T-RNG-SA-{n}-b", employee, "_T-RNG Late", add_days(mid, 1), None, 1, "Active"))
+		frappe.db.bulk_insert(
+			"Shift Assignment",
+			["name", "employee", "shift_type", "start_date", "end_date", "docstatus", "status"],
+			assignments,
+			ignore_duplicates=True,
+		)
+		invalidate_rosters()
+
+		# Arrivals drift across the grace boundary, with seconds, so rounding matters.
+		rows = []
+		for n, employee in enumerate(TEST_EMPLOYEES):
+			d = cls.month_start
+			while d <= cls.month_end:
+				offset = datetime.timedelta(minutes=(d.day * 7 + n * 3) % 45, seconds=(d.day * 13) % 60)
+				start = datetime.datetime.combine(d, datetime.time(9)) if d <= mid else datetime.datetime.combine(
+					d, datetime.time(13)
+				)
+				first_in = start - datetime.timedelta(minutes=15) + offset
+				last_out = first_in + datetime.timedelta(hours=8, minutes=n * 5) if d.day % 6 else None
+				rows.append({
+					"employee": employee,
+					"employee_name": employee,
+					"attendance_date": d,
+					"first_in": first_in,
+					"last_out": last_out,
+					"checkin_count": 2 if last_out else 1,
+				})
+				d = add_days(d, 1)
+		_upsert_summary_rows(rows)
+
+	@classmethod
+	def tearDownClass(cls):
+		frappe.db.delete("Daily Attendance Summary", {"employee": ["in", TEST_EMPLOYEES]})
+		frappe.db.delete("Shift Assignment", {"employee": ["in", TEST_EMPLOYEES]})
+		frappe.db.delete("Shift Type", {"name": ["in", list(TEST_SHIFTS)]})
+		frappe.db.delete("Employee", {"name": ["in", TEST_EMPLOYEES]})
+		frappe.db.commit()
+		# The roster cache lives in Redis and outlasts the rollback.
+		invalidate_rosters()
+		super().tearDownClass()
+
+	def test_matches_per_day_loop(self):
+		employees = [{"name": e, "employee_name": e, "holiday_list": None} for e in TEST_EMPLOYEES]
+		expected = _build_employee_months(employees, self.month_start, self.month_end, GRACE_MINUTES)
+		actual = get_attendance_for_range(self.month_start, self.month_end, grace_minutes=GRACE_MINUTES)
+
+		for employee in TEST_EMPLOYEES:
+			days = expected[employee]["days"]
+			self.assertEqual(actual[employee]["late_days"], sum(r["is_late"] for r in days), employee)
+			self.assertEqual(actual[employee]["late_minutes"], sum(r["late_by_minutes"] for r in days), employee)
+			self.assertEqual(
+				actual[employee]["weekly_working_hours"], expected[employee]["weekly_working_hours"], employee
+			)
+			self.assertEqual(
+				actual[employee]["total_working_hours"], expected[employee]["total_working_hours"], employee
+			)
+
+	def test_requires_hr_role(self):
+		frappe.set_user("Guest")
+		try:
+			with self.assertRaises(frappe.PermissionError):
+				get_attendance_for_range(self.month_start, self.month_end)
+		finally:
+			frappe.set_user("Administrator")
@@ -0,0 +1,123 @@
+# Copyright (c) 2026, Urvish Sanghvi and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_days, add_to_date, getdate, now_datetime
+
+from fbts.api.anomalies import CHANGED_PAIRS_QUERY, DAY_CHECKINS_QUERY
+from fbts.api.checkin_ingest import EXISTING_PREVIOUS_QUERY, EXISTING_WINDOW_QUERY
+from fbts.api.checkins import (
+	CHECKIN_TIME_BOUNDS_QUERY,
+	LAST_CHECKIN_QUERY,
+	OPEN_REGULARISE_QUERY,
+	OUT_OF_FENCE_QUERY,
+	RECENT_CHECKINS_QUERY,
+	daily_bounds_query,
+)
+from fbts.patches.add_employee_checkin_creation_index import execute as add_creation_index
+from fbts.patches.add_employee_checkin_indexes import execute as add_checkin_indexes
+from fbts.patches.add_geofence_status_index import execute as add_geofence_index
+
+TEST_EMPLOYEES = [f"_T-IDX-{i:03d}" for i in range(20)]
+
+
+class TestCheckinIndexes(FrappeTestCase):
+	@classmethod
+	def setUpClass(cls):
+		super().setUpClass()
+		add_checkin_indexes()
+		add_geofence_index()
+		add_creation_index()
+
+		# Enough rows spread over several employees that the optimizer has a
+		# real choice between the composite indexes and a table scan.
+		start = now_datetime().replace(hour=9, minute=0, second=0, microsecond=0)
+		values = []
+		for n, employee in enumerate(TEST_EMPLOYEES):
+			for day in range(15):
+				for i, log_type in enumerate(("IN", "OUT")):
+					values.append(
+						(
+							f"_T-IDX-{n}-{day}-{i}",
+							employee,
+							log_type,
+							add_to_date(start, days=-day, hours=9 * i),
+							"_T-approver@example.com" if day % 5 == 0 else None,
+							"Open" if day % 5 == 0 else None,
+							"Outside" if day % 3 == 0 else "Inside",
+						)
+					)
+		frappe.db.bulk_insert(
+			"Employee Checkin",
+			[
+				"name",
+				"employee",
+				"log_type",
+				"time",
+				"custom_regularise_approver",
+				"custom_status",
+				"custom_geofence_status",
+			],
+			values,
+			ignore_duplicates=True,
+		)
+		frappe.db.sql("ANALYZE TABLE `tabEmployee Checkin`")
+
+	@classmethod
+	def tearDownClass(cls):
+		# ANALYZE TABLE committed the fixture rows, so the rollback cannot drop them.
+		frappe.db.delete("Employee Checkin", {"name": ["like", "_T-IDX-%"]})
+		frappe.db.commit()
+		super().tearDownClass()
+
+	def assertUsesIndex(self, query, values, tables=("tabEmployee Checkin",)):
+		plan = frappe.db.sql(f"EXPLAIN {query}", values, as_dict=True)
+		for row in plan:
+			if row.get("table") not in tables:
+				continue
+			self.assertNotEqual(row.get("type"), "ALL", f"full scan of tabEmployee Checkin:\n{query}")
+			self.assertTrue(row.get("key"), f"no index used for tabEmployee Checkin:\n{query}")
+
+	def test_per_employee_readers_use_index(self):
+		employee = TEST_EMPLOYEES[0]
+		self.assertUsesIndex(LAST_CHECKIN_QUERY, {"employee": employee})
+		self.assertUsesIndex(RECENT_CHECKINS_QUERY, {"employee": employee, "limit": 5})
+
+	def test_daily_bounds_uses_range(self):
+		today = getdate()
+		self.assertUsesIndex(
+			daily_bounds_query(TEST_EMPLOYEES[0]),
+			{"employee": TEST_EMPLOYEES[0], "start": today, "end": add_days(today, 1)},
+		)
+
+	def test_org_wide_daily_bounds_uses_range(self):
+		today = getdate()
+		self.assertUsesIndex(daily_bounds_query(), {"start": today, "end": add_days(today, 1)})
+
+	def test_out_of_fence_inbox_uses_index(self):
+		self.assertUsesIndex(
+			OUT_OF_FENCE_QUERY, {"approver": "_T-approver@example.com", "limit": 5}, tables=("c",)
+		)
+
+	def test_regularise_inbox_uses_index(self):
+		self.assertUsesIndex(OPEN_REGULARISE_QUERY, {"approver": "_T-approver@example.com", "limit": 5})
+
+	def test_anomaly_readers_use_index(self):
+		today = getdate()
+		self.assertUsesIndex(
+			DAY_CHECKINS_QUERY, {"employee": TEST_EMPLOYEES[0], "start": today, "end": add_days(today, 1)}
+		)
+		since = add_to_date(now_datetime(), minutes=-5)
+		self.assertUsesIndex(
+			CHANGED_PAIRS_QUERY, {"start": since, "end": now_datetime()}, tables=("tabEmployee Checkin", "c")
+		)
+
+	def test_ingest_dedupe_readers_use_index(self):
+		values = {"employees": tuple(TEST_EMPLOYEES[:3]), "start": getdate(), "end": now_datetime()}
+		self.assertUsesIndex(EXISTING_WINDOW_QUERY, values)
+		self.assertUsesIndex(EXISTING_PREVIOUS_QUERY, values, tables=("tabEmployee Checkin", "c"))
+
+	def test_time_bounds_read_only_the_index(self):
+		plan = frappe.db.sql(f"EXPLAIN {CHECKIN_TIME_BOUNDS_QUERY}", as_dict=True)
+		self.assertIn("optimized away", plan[0].get("Extra") or "")
@@ -0,0 +1,39 @@
+# Copyright (c) 2026, Urvish Sanghvi and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import now_datetime
+
+from fbts.api.checkin_ingest import ingest_checkins
+
+EMPLOYEE_USER = "_t-ingest-employee@example.com"
+
+
+class TestCheckinIngest(FrappeTestCase):
+	@classmethod
+	def setUpClass(cls):
+		super().setUpClass()
+		if not frappe.db.exists("User", EMPLOYEE_USER):
+			frappe.get_doc(
+				{
+					"doctype": "User",
+					"email": EMPLOYEE_USER,
+					"first_name": "Ingest",
+					"send_welcome_email": 0,
+					"roles": [{"role": "Employee"}],
+				}
+			).insert(ignore_permissions=True)
+
+	def tearDown(self):
+		frappe.set_user("Administrator")
+
+	def test_employee_cannot_ingest(self):
+		frappe.set_user(EMPLOYEE_USER)
+		with self.assertRaises(frappe.PermissionError):
+			ingest_checkins([{"employee": "_T-ANY", "time": str(now_datetime())}])
+
+	def test_guest_cannot_ingest(self):
+		frappe.set_user("Guest")
+		with self.assertRaises(frappe.PermissionError):
+			ingest_checkins([{"employee": "_T-ANY", "time": str(now_datetime())}])
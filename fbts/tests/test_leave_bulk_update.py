@@ -0,0 +1,55 @@
+# Copyright (c) 2026, Urvish Sanghvi and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import getdate
+
+from fbts.api.leave_request import bulk_update_leave_status
+
+TEST_LEAVE = "_T-BULK-LA-0001"
+APPROVER = "_t-bulk-approver@example.com"
+OTHER_USER = "_t-bulk-other@example.com"
+
+
+class TestLeaveBulkUpdate(FrappeTestCase):
+	@classmethod
+	def setUpClass(cls):
+		super().setUpClass()
+		if not frappe.db.exists("User", OTHER_USER):
+			frappe.get_doc(
+				{"doctype": "User", "email": OTHER_USER, "first_name": "Other", "send_welcome_email": 0}
+			).insert(ignore_permissions=True)
+		frappe.db.bulk_insert(
+			"Leave Application",
+			["name", "employee", "leave_type", "from_date", "to_date", "posting_date", "status", "leave_approver"],
+			[(TEST_LEAVE, "_T-BULK-EMP", "_T-BULK Leave", getdate(), getdate(), getdate(), "Open", APPROVER)],
+			ignore_duplicates=True,
+		)
+
+	@classmethod
+	def tearDownClass(cls):
+		# bulk_update_leave_status commits, so the fixtures outlive the rollback.
+		frappe.set_user("Administrator")
+		frappe.db.delete("Leave Application", {"name": TEST_LEAVE})
+		frappe.delete_doc("User", OTHER_USER, force=True, ignore_permissions=True)
+		frappe.db.commit()
+		super().tearDownClass()
+
+	def tearDown(self):
+		frappe.set_user("Administrator")
+
+	def assertRejected(self, user):
+		frappe.set_user(user)
+		response = bulk_update_leave_status([TEST_LEAVE], status="Approved")
+
+		self.assertEqual(response["updated"], 0)
+		self.assertFalse(response["results"][0]["ok"])
+		self.assertIn("Not permitted", response["results"][0]["error"])
+		self.assertEqual(frappe.db.get_value("Leave Application", TEST_LEAVE, "status"), "Open")
+
+	def test_guest_cannot_decide(self):
+		self.assertRejected("Guest")
+
+	def test_non_approver_cannot_decide(self):
+		self.assertRejected(OTHER_USER)
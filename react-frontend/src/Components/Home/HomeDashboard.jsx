@@ -1,14 +1,10 @@
 import React, { useEffect, useState } from "react";
 import "./HomeDashboard.css";
-import axios from "axios";
 import { FaBirthdayCake, FaCalendarAlt } from "react-icons/fa";
 import Arrow from "../../assets/Arrow.png";
 import Header from "../Header/Header";
 import Checkin from "./Checkin";
-import {
-  fetchHolidayList,
-  fetchTodayBirthdays,
-} from "./dashboardApi";
+import { fetchHomeDashboard } from "./dashboardApi";
 import dayjs from "dayjs";
 import { Link } from "react-router-dom";
 
@@ -29,18 +25,11 @@ const HomeDashboard = () => {
 
     const fetchData = async () => {
       try {
-        // ✅ Direct API call to get last 10 attendance records
-        const attendanceRes = await axios.post(
-          "https://fbts.flamingohrms.com/api/method/fbts.api.work_duration.get_last_10_attendance_records",
-          { employee: employeeId }
-        );
-        const attendance = attendanceRes.data.message?.records || [];
-
-        // Other API calls (holidays, birthdays)
-        const [holidayList, birthdayData] = await Promise.all([
-          fetchHolidayList(employeeId),
-          fetchTodayBirthdays(),
-        ]);
+        // ✅ One request for the sections this page renders
+        const dashboard = await fetchHomeDashboard(employeeId, ["attendance", "holidays", "birthdays"]);
+        const attendance = dashboard.attendance;
+        const holidayList = dashboard.holidays;
+        const birthdayData = dashboard.birthdays;
 
         const today = dayjs();
         const endOfYear = dayjs().endOf("year");
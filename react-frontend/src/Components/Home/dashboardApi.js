@@ -209,6 +209,30 @@
 
 
 import api from "../../api"; 
+// Get the Home dashboard sections in one request (omit `sections` for all of them)
+export const fetchHomeDashboard = async (employeeId, sections) => {
+  try {
+    const result = await api.getHomeDashboard(employeeId, sections);
+    const msg = result?.message ?? result ?? {};
+    const data = msg.sections || {};
+    return {
+      attendance: data.attendance || [],
+      holidays: data.holidays || [],
+      birthdays: {
+        employees: data.birthdays?.employees || [],
+        count: data.birthdays?.count || 0,
+      },
+      leaveBalance: data.leave_balance || {},
+      monthly: data.monthly || {},
+      leaves: data.leaves || [],
+      errors: msg.errors || {},
+    };
+  } catch (error) {
+    console.error('Error fetching home dashboard:', error);
+    throw error;
+  }
+};
+
 // Get last 10 attendance records
 export const fetchAttendanceRecords = async (employeeId) => {
   try {
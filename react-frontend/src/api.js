@@ -259,6 +259,13 @@ class ApiService {
     return this.get('fbts.api.leave_request.get_leave_applications');
   }
 
+  async getHomeDashboard(employee, sections) {
+    return this.get('fbts.api.dashboard.get_home_dashboard', {
+      employee,
+      sections: sections ? sections.join(',') : undefined,
+    });
+  }
+
   // Utility methods
   isAuthenticated() {
     return localStorage.getItem('user_logged_in') === 'true';